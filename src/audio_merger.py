@@ -3,9 +3,16 @@
 """
 
 import os
-import time
+import wave
+import struct
 import tempfile
-from typing import List, Optional, Dict, Any
+import queue
+import shutil
+import subprocess
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 import structlog
 
@@ -17,30 +24,125 @@ except ImportError:
     AudioSegment = None
     which = None
 
+# Импорт soundfile для чтения заголовков аудио без декодирования
+# (OSError - пакет установлен, но нет библиотеки libsndfile)
+try:
+    import soundfile
+except (ImportError, OSError):
+    soundfile = None
+
 from utils import ensure_directory, format_file_size, format_duration
 
 logger = structlog.get_logger(__name__)
 
+# Размер буфера при потоковом копировании PCM данных
+_COPY_BLOCK_SIZE = 1 << 20
+
+# Параметры кодирования ffmpeg для сжатых целевых форматов
+_FFMPEG_CODEC_ARGS = {
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', '128k'],
+    'ogg': ['-c:a', 'libvorbis', '-q:a', '5'],
+}
+
+# Размер сэмпла в байтах для подтипов libsndfile (для сжатых форматов неизвестен)
+_SOUNDFILE_SAMPLE_WIDTHS = {
+    'PCM_S8': 1,
+    'PCM_U8': 1,
+    'PCM_16': 2,
+    'PCM_24': 3,
+    'PCM_32': 4,
+    'FLOAT': 4,
+    'DOUBLE': 8,
+}
+
+# Формат сырых PCM данных ffmpeg по размеру сэмпла
+_FFMPEG_PCM_FORMATS = {
+    1: 'u8',
+    2: 's16le',
+    3: 's24le',
+    4: 's32le',
+}
+
+# Параметры кодирования ffmpeg при конвертации отдельных файлов
+_FFMPEG_ENCODE_ARGS = {
+    **_FFMPEG_CODEC_ARGS,
+    'wav': ['-c:a', 'pcm_s16le'],
+}
+
 
 class AudioMergerError(Exception):
     """Исключение для ошибок объединения аудио"""
     pass
 
 
+@lru_cache(maxsize=8)
+def _find_executable(name: str) -> Optional[str]:
+    """
+    Поиск исполняемого файла в PATH (один раз за процесс)
+    
+    Args:
+        name: Имя исполняемого файла
+    
+    Returns:
+        Путь к файлу или None
+    """
+    return which(name) if which is not None else None
+
+
+def _convert_one(ffmpeg_path: str, input_path: str, output_path: str, target_format: str) -> str:
+    """
+    Конвертация одного файла через ffmpeg (выполняется в пуле потоков)
+    
+    Args:
+        ffmpeg_path: Путь к исполняемому файлу ffmpeg
+        input_path: Путь к исходному файлу
+        output_path: Путь для сохранения результата
+        target_format: Целевой формат
+    
+    Returns:
+        Путь к сконвертированному файлу
+    """
+    command = [
+        ffmpeg_path, '-y', '-loglevel', 'error',
+        '-i', input_path,
+        *_FFMPEG_ENCODE_ARGS[target_format],
+        '-f', target_format,
+        output_path
+    ]
+    
+    result = subprocess.run(command, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    
+    if result.returncode != 0:
+        raise AudioMergerError(
+            f"ffmpeg завершился с кодом {result.returncode}: {result.stderr.strip()[-500:]}"
+        )
+    
+    if not os.path.exists(output_path):
+        raise AudioMergerError("Сконвертированный файл не был создан")
+    
+    return output_path
+
+
 class AudioMerger:
     """Класс для объединения аудиофрагментов"""
     
-    def __init__(self, temp_dir: str = None):
+    def __init__(self, temp_dir: str = None, max_workers: int = None):
         """
         Инициализация объединителя аудио
         
         Args:
             temp_dir: Директория для временных файлов
+            max_workers: Максимальное количество параллельных конвертаций
         """
         if AudioSegment is None:
             raise AudioMergerError("pydub не установлен")
         
         self.temp_dir = temp_dir or os.getenv('TEMP_DIR', tempfile.gettempdir())
+        self.max_workers = max_workers or os.cpu_count() or 1
+        
+        # Выше этого объема WAV склеивается потоково, без буфера в памяти
+        self.max_merge_buffer = int(os.getenv('WAV_MERGE_BUFFER_MB', '256')) * 1024 * 1024
+        self.ffmpeg_path: Optional[str] = None
         
         # Проверяем наличие ffmpeg
         self._check_ffmpeg()
@@ -56,8 +158,9 @@ class AudioMerger:
             logger.warning("Не удалось проверить наличие ffmpeg")
             return
         
-        ffmpeg_path = which("ffmpeg")
+        ffmpeg_path = _find_executable("ffmpeg")
         if ffmpeg_path:
+            self.ffmpeg_path = ffmpeg_path
             logger.debug(f"ffmpeg найден: {ffmpeg_path}")
         else:
             logger.warning("ffmpeg не найден, некоторые форматы могут не поддерживаться")
@@ -70,14 +173,37 @@ class AudioMerger:
             audio_files: Список путей к аудиофайлам
             output_path: Путь для сохранения результата
         
+        Returns:
+            Путь к объединенному файлу
+        """
+        return self._merge_files(audio_files, output_path, 'wav')
+    
+    def _merge_files(self, audio_files: List[str], output_path: str, target_format: str) -> str:
+        """
+        Объединение WAV фрагментов с записью сразу в целевой формат
+        
+        Args:
+            audio_files: Список путей к аудиофайлам
+            output_path: Путь для сохранения результата
+            target_format: Целевой формат (wav, mp3, ogg)
+        
         Returns:
             Путь к объединенному файлу
         """
         if not audio_files:
             raise AudioMergerError("Пустой список аудиофайлов для объединения")
         
-        # Фильтруем существующие файлы
-        existing_files = [f for f in audio_files if f and os.path.exists(f)]
+        # Фильтруем существующие файлы (один stat на файл)
+        file_stats = []
+        for audio_file in audio_files:
+            if not audio_file:
+                continue
+            try:
+                file_stats.append((audio_file, os.stat(audio_file)))
+            except FileNotFoundError:
+                continue
+        
+        existing_files = [audio_file for audio_file, _ in file_stats]
         
         if not existing_files:
             raise AudioMergerError("Не найдено ни одного существующего аудиофайла")
@@ -89,44 +215,74 @@ class AudioMerger:
         logger.info(
             "Начинаем объединение аудиофайлов",
             total_files=len(existing_files),
+            total_size=format_file_size(sum(stat.st_size for _, stat in file_stats)),
             output_path=output_path
         )
         
         try:
-            # Загружаем первый файл как основу
-            combined_audio = AudioSegment.from_wav(existing_files[0])
-            logger.debug(f"Загружен базовый файл: {existing_files[0]}")
-            
-            # Добавляем остальные файлы
-            for i, audio_file in enumerate(existing_files[1:], 1):
-                try:
-                    audio_segment = AudioSegment.from_wav(audio_file)
-                    combined_audio += audio_segment
-                    
-                    logger.debug(
-                        f"Добавлен файл {i + 1}/{len(existing_files)}: {audio_file}",
-                        duration=len(audio_segment) / 1000.0
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Ошибка загрузки файла {audio_file}: {e}")
-                    # Продолжаем с остальными файлами
-            
             # Создаем директорию для выходного файла
             output_dir = os.path.dirname(output_path)
             if output_dir:
                 ensure_directory(output_dir)
             
-            # Сохраняем объединенный файл
-            combined_audio.export(output_path, format="wav")
+            # Единственный фрагмент нужного формата просто копируем, без декодирования
+            if len(existing_files) == 1 and Path(existing_files[0]).suffix.lower() == f'.{target_format}':
+                shutil.copyfile(existing_files[0], output_path)
+                logger.info(
+                    "Единственный аудиофайл скопирован без объединения",
+                    output_file=output_path,
+                    file_size=format_file_size(file_stats[0][1].st_size)
+                )
+                return output_path
             
-            # Проверяем, что файл создан
-            if not os.path.exists(output_path):
-                raise AudioMergerError("Объединенный файл не был создан")
+            # Для однородных фрагментов склеиваем PCM данные напрямую
+            wav_layout = self._read_wav_layout(existing_files)
             
-            # Получаем информацию о результате
-            file_size = os.path.getsize(output_path)
-            duration = len(combined_audio) / 1000.0  # в секундах
+            if wav_layout is not None:
+                params, total_frames = wav_layout
+                duration = total_frames / params.framerate  # в секундах
+                total_bytes = total_frames * params.sampwidth * params.nchannels
+                
+                if target_format == 'wav' and total_bytes > self.max_merge_buffer:
+                    # Большие наборы копируем потоково, не собирая в памяти
+                    self._stream_wav_frames(existing_files, output_path, params, total_frames)
+                elif target_format == 'wav':
+                    frames = self._concat_wav_frames(existing_files, params, total_frames)
+                    _write_wav(output_path, frames, params.nchannels, params.sampwidth, params.framerate)
+                elif self._ffmpeg_concat(existing_files, output_path, target_format):
+                    # Склейка и кодирование одной командой ffmpeg, без PCM в памяти
+                    pass
+                else:
+                    frames = self._concat_wav_frames(existing_files, params, total_frames)
+                    combined_audio = AudioSegment(
+                        data=bytes(frames),
+                        sample_width=params.sampwidth,
+                        frame_rate=params.framerate,
+                        channels=params.nchannels
+                    )
+                    combined_audio.export(
+                        output_path, format=target_format, **dict(self._get_export_params(target_format))
+                    )
+            else:
+                logger.warning("Параметры WAV фрагментов различаются, используем pydub")
+                combined_audio = self._merge_with_pydub(existing_files)
+                
+                if target_format == 'wav':
+                    _write_wav(
+                        output_path, combined_audio.raw_data, combined_audio.channels,
+                        combined_audio.sample_width, combined_audio.frame_rate
+                    )
+                else:
+                    combined_audio.export(
+                        output_path, format=target_format, **dict(self._get_export_params(target_format))
+                    )
+                duration = len(combined_audio) / 1000.0  # в секундах
+            
+            # Проверяем, что файл создан, и получаем его размер
+            try:
+                file_size = os.stat(output_path).st_size
+            except FileNotFoundError:
+                raise AudioMergerError("Объединенный файл не был создан")
             
             logger.info(
                 "Аудиофайлы успешно объединены",
@@ -141,6 +297,155 @@ class AudioMerger:
         except Exception as e:
             raise AudioMergerError(f"Ошибка объединения аудиофайлов: {e}")
     
+    def _read_wav_layout(self, audio_files: List[str]) -> Optional[Tuple[Any, int]]:
+        """
+        Чтение параметров WAV файлов
+        
+        Args:
+            audio_files: Список путей к аудиофайлам
+        
+        Returns:
+            Кортеж (параметры первого файла, общее количество фреймов)
+            или None, если параметры фрагментов различаются
+        """
+        base_params = None
+        total_frames = 0
+        
+        try:
+            for audio_file in audio_files:
+                with wave.open(audio_file, 'rb') as wf:
+                    params = wf.getparams()
+                
+                if base_params is None:
+                    base_params = params
+                elif (params.nchannels, params.sampwidth, params.framerate, params.comptype) != (
+                    base_params.nchannels, base_params.sampwidth, base_params.framerate, base_params.comptype
+                ):
+                    return None
+                
+                total_frames += params.nframes
+                
+        except (wave.Error, EOFError, OSError) as e:
+            logger.debug(f"Не удалось прочитать заголовок WAV: {e}")
+            return None
+        
+        return base_params, total_frames
+    
+    def _concat_wav_frames(self, 
+                           audio_files: List[str], 
+                           params: Any, 
+                           total_frames: int) -> memoryview:
+        """
+        Склейка PCM данных однородных WAV файлов в предвыделенный буфер
+        
+        Args:
+            audio_files: Список путей к аудиофайлам
+            params: Параметры WAV (из первого файла)
+            total_frames: Общее количество фреймов
+        
+        Returns:
+            PCM данные всех фрагментов
+        """
+        frame_size = params.sampwidth * params.nchannels
+        buffer = bytearray(total_frames * frame_size)
+        offset = 0
+        
+        for audio_file in audio_files:
+            with wave.open(audio_file, 'rb') as wf:
+                frames = wf.readframes(wf.getnframes())
+            
+            buffer[offset:offset + len(frames)] = frames
+            offset += len(frames)
+        
+        return memoryview(buffer)[:offset]
+    
+    def _stream_wav_frames(self, 
+                           audio_files: List[str], 
+                           output_path: str, 
+                           params: Any, 
+                           total_frames: int) -> None:
+        """
+        Потоковая склейка однородных WAV файлов без буфера в памяти
+        
+        Заголовок с итоговым размером записывается один раз, затем
+        PCM данные каждого фрагмента копируются блоками по 1 МБ.
+        
+        Args:
+            audio_files: Список путей к аудиофайлам
+            output_path: Путь для сохранения результата
+            params: Параметры WAV (из первого файла)
+            total_frames: Общее количество фреймов
+        """
+        block_align = params.sampwidth * params.nchannels
+        data_size = total_frames * block_align
+        
+        header = struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + data_size, b'WAVE',
+            b'fmt ', 16, 1, params.nchannels, params.framerate,
+            params.framerate * block_align, block_align, params.sampwidth * 8,
+            b'data', data_size
+        )
+        
+        with open(output_path, 'wb') as dst:
+            dst.write(header)
+            
+            for audio_file in audio_files:
+                with open(audio_file, 'rb') as src:
+                    data_offset, chunk_size = _find_wav_data_chunk(src)
+                    
+                    with wave.open(audio_file, 'rb') as wf:
+                        remaining = min(chunk_size, wf.getnframes() * block_align)
+                    
+                    src.seek(data_offset)
+                    while remaining > 0:
+                        block = src.read(min(_COPY_BLOCK_SIZE, remaining))
+                        if not block:
+                            break
+                        dst.write(block)
+                        remaining -= len(block)
+    
+    def _merge_with_pydub(self, audio_files: List[str]) -> "AudioSegment":
+        """
+        Объединение разнородных WAV файлов через pydub
+        
+        Args:
+            audio_files: Список путей к аудиофайлам
+        
+        Returns:
+            Объединенный AudioSegment
+        """
+        # Загружаем первый файл как основу
+        base_audio = AudioSegment.from_wav(audio_files[0])
+        logger.debug(f"Загружен базовый файл: {audio_files[0]}")
+        
+        raw_chunks = [base_audio.raw_data]
+        
+        # Добавляем остальные файлы, приводя их к параметрам базового
+        for i, audio_file in enumerate(audio_files[1:], 1):
+            try:
+                audio_segment = (
+                    AudioSegment.from_wav(audio_file)
+                    .set_frame_rate(base_audio.frame_rate)
+                    .set_channels(base_audio.channels)
+                    .set_sample_width(base_audio.sample_width)
+                )
+                raw_chunks.append(audio_segment.raw_data)
+                
+                logger.debug(
+                    f"Добавлен файл {i + 1}/{len(audio_files)}: {audio_file}",
+                    duration=len(audio_segment) / 1000.0
+                )
+                
+            except Exception as e:
+                logger.error(f"Ошибка загрузки файла {audio_file}: {e}")
+                # Продолжаем с остальными файлами
+        
+        # Склеиваем данные одним копированием вместо повторных +=
+        combined_audio = base_audio._spawn(b''.join(raw_chunks))
+        
+        return combined_audio
+    
     def convert_format(self, input_path: str, output_path: str, target_format: str) -> str:
         """
         Конвертация аудиофайла в другой формат
@@ -173,33 +478,15 @@ class AudioMerger:
         )
         
         try:
-            # Загружаем исходный файл
-            audio = AudioSegment.from_file(input_path)
-            
-            # Создаем директорию для выходного файла
-            output_dir = os.path.dirname(output_path)
-            if output_dir:
-                ensure_directory(output_dir)
-            
-            # Настройки экспорта для разных форматов
-            export_params = self._get_export_params(target_format)
-            
-            # Экспортируем в целевой формат
-            audio.export(output_path, format=target_format, **export_params)
-            
-            # Проверяем, что файл создан
-            if not os.path.exists(output_path):
-                raise AudioMergerError("Сконвертированный файл не был создан")
+            self.convert_many([(input_path, output_path, target_format)])
             
             # Получаем информацию о результате
             input_size = os.path.getsize(input_path)
             output_size = os.path.getsize(output_path)
-            duration = len(audio) / 1000.0
             
             logger.info(
                 "Аудиофайл успешно сконвертирован",
                 output_file=output_path,
-                duration=format_duration(duration),
                 input_size=format_file_size(input_size),
                 output_size=format_file_size(output_size),
                 compression_ratio=output_size / input_size if input_size > 0 else 0
@@ -210,34 +497,124 @@ class AudioMerger:
         except Exception as e:
             raise AudioMergerError(f"Ошибка конвертации аудиофайла: {e}")
     
-    def _get_export_params(self, format_name: str) -> Dict[str, Any]:
+    def convert_many(self, pairs: List[Tuple[str, str, str]]) -> List[str]:
+        """
+        Параллельная конвертация набора аудиофайлов через ffmpeg
+        
+        Если ffmpeg не найден, файлы конвертируются по очереди через pydub.
+        
+        Args:
+            pairs: Список кортежей (исходный файл, выходной файл, целевой формат)
+        
+        Returns:
+            Список путей к сконвертированным файлам в исходном порядке
+        """
+        if not pairs:
+            return []
+        
+        tasks = []
+        for input_path, output_path, target_format in pairs:
+            target_format = target_format.lower()
+            if target_format not in _FFMPEG_ENCODE_ARGS:
+                raise AudioMergerError(f"Неподдерживаемый формат: {target_format}")
+            
+            # Создаем директорию для выходного файла
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                ensure_directory(output_dir)
+            
+            tasks.append((input_path, output_path, target_format))
+        
+        # Без ffmpeg конвертируем через pydub (WAV пишется без ffmpeg)
+        if self.ffmpeg_path is None:
+            return [self._convert_with_pydub(*task) for task in tasks]
+        
+        # Один файл конвертируем без запуска пула потоков
+        if len(tasks) == 1:
+            return [_convert_one(self.ffmpeg_path, *tasks[0])]
+        
+        # Работу выполняют процессы ffmpeg, потокам достаточно их дождаться
+        workers = min(self.max_workers, len(tasks))
+        logger.debug(f"Конвертация {len(tasks)} файлов в {workers} потоках")
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="convert") as executor:
+            futures = [executor.submit(_convert_one, self.ffmpeg_path, *task) for task in tasks]
+            return [future.result() for future in futures]
+    
+    def _convert_with_pydub(self, input_path: str, output_path: str, target_format: str) -> str:
+        """
+        Конвертация одного файла через pydub (если ffmpeg не найден)
+        
+        Args:
+            input_path: Путь к исходному файлу
+            output_path: Путь для сохранения результата
+            target_format: Целевой формат
+        
+        Returns:
+            Путь к сконвертированному файлу
+        """
+        audio = AudioSegment.from_file(input_path)
+        
+        if target_format == 'wav':
+            _write_wav(output_path, audio.raw_data, audio.channels, audio.sample_width, audio.frame_rate)
+        else:
+            audio.export(output_path, format=target_format, **dict(self._get_export_params(target_format)))
+        
+        if not os.path.exists(output_path):
+            raise AudioMergerError("Сконвертированный файл не был создан")
+        
+        return output_path
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _get_export_params(format_name: str) -> Tuple[Tuple[str, Any], ...]:
         """
         Получение параметров экспорта для формата
         
+        Параметры неизменяемы и кэшируются; словарь для export()
+        собирается на месте вызова.
+        
         Args:
             format_name: Название формата
         
         Returns:
-            Словарь с параметрами
+            Кортеж пар (имя параметра, значение)
         """
-        params = {}
-        
         if format_name == 'mp3':
-            params.update({
-                'bitrate': '128k',
-                'parameters': ['-q:a', '2']  # Качество VBR
-            })
+            return (
+                ('bitrate', '128k'),
+                ('parameters', ('-q:a', '2'))  # Качество VBR
+            )
         elif format_name == 'ogg':
-            params.update({
-                'codec': 'libvorbis',
-                'parameters': ['-q:a', '5']  # Качество Vorbis
-            })
+            return (
+                ('codec', 'libvorbis'),
+                ('parameters', ('-q:a', '5'))  # Качество Vorbis
+            )
         elif format_name == 'wav':
-            params.update({
-                'parameters': ['-acodec', 'pcm_s16le']  # 16-bit PCM
-            })
+            return (
+                ('parameters', ('-acodec', 'pcm_s16le')),  # 16-bit PCM
+            )
+        
+        return ()
+    
+    def start_streaming_merge(self, output_path: str, target_format: str = 'wav') -> Optional["StreamingAudioMerger"]:
+        """
+        Запуск потокового объединения фрагментов по мере их готовности
+        
+        Args:
+            output_path: Путь для сохранения результата
+            target_format: Целевой формат
+        
+        Returns:
+            Запущенный StreamingAudioMerger или None, если для формата нужен
+            отсутствующий ffmpeg
+        """
+        target_format = target_format.lower()
+        
+        if target_format != 'wav' and (self.ffmpeg_path is None or target_format not in _FFMPEG_ENCODE_ARGS):
+            return None
         
-        return params
+        return StreamingAudioMerger(output_path, target_format, self.ffmpeg_path).start()
     
     def merge_and_convert(self, 
                          audio_files: List[str], 
@@ -254,35 +631,69 @@ class AudioMerger:
         Returns:
             Путь к финальному файлу
         """
-        target_format = target_format.lower()
+        # Одиночный файл копируется, WAV склеивается без ffmpeg, а для
+        # mp3/ogg из однородных фрагментов используется ffmpeg concat
+        return self._merge_files(audio_files, output_path, target_format.lower())
+    
+    def _ffmpeg_concat(self, audio_files: List[str], output_path: str, target_format: str) -> bool:
+        """
+        Объединение и кодирование однородных WAV фрагментов через ffmpeg concat demuxer
         
-        # Если целевой формат WAV, объединяем напрямую
-        if target_format == 'wav':
-            return self.merge_wav_files(audio_files, output_path)
+        Вызывающий код проверяет существование файлов и совпадение их
+        параметров: concat demuxer не приводит параметры к общим.
         
-        # Для других форматов сначала объединяем в WAV, затем конвертируем
-        temp_wav_path = os.path.join(
-            self.temp_dir,
-            f"temp_merged_{int(time.time())}.wav"
-        )
+        Args:
+            audio_files: Список путей к существующим WAV фрагментам
+            output_path: Путь для сохранения результата
+            target_format: Целевой формат (mp3, ogg)
+        
+        Returns:
+            True если объединение прошло успешно
+        """
+        codec_args = _FFMPEG_CODEC_ARGS.get(target_format)
+        if self.ffmpeg_path is None or codec_args is None:
+            return False
+        
+        ensure_directory(self.temp_dir)
+        
+        # Список файлов для concat demuxer
+        list_fd, list_path = tempfile.mkstemp(suffix='.txt', prefix='concat_', dir=self.temp_dir)
         
         try:
-            # Объединяем в WAV
-            self.merge_wav_files(audio_files, temp_wav_path)
+            with os.fdopen(list_fd, 'w', encoding='utf-8') as list_file:
+                for audio_file in audio_files:
+                    escaped_path = os.path.abspath(audio_file).replace("'", "'\\''")
+                    list_file.write(f"file '{escaped_path}'\n")
             
-            # Конвертируем в целевой формат
-            result_path = self.convert_format(temp_wav_path, output_path, target_format)
+            command = [
+                self.ffmpeg_path, '-y', '-loglevel', 'error',
+                '-f', 'concat', '-safe', '0', '-i', list_path,
+                *codec_args,
+                '-f', target_format,
+                output_path
+            ]
             
-            return result_path
+            result = subprocess.run(command, capture_output=True, text=True, stdin=subprocess.DEVNULL)
             
+            if result.returncode != 0:
+                logger.warning(
+                    "ffmpeg не смог объединить файлы, используем pydub",
+                    returncode=result.returncode,
+                    stderr=result.stderr.strip()[-500:]
+                )
+                return False
+            
+            logger.debug("Аудиофайлы объединены через ffmpeg concat", target_format=target_format)
+            return True
+            
+        except OSError as e:
+            logger.warning(f"Ошибка запуска ffmpeg: {e}")
+            return False
         finally:
-            # Удаляем временный файл
-            if os.path.exists(temp_wav_path):
-                try:
-                    os.unlink(temp_wav_path)
-                    logger.debug(f"Удален временный файл: {temp_wav_path}")
-                except OSError as e:
-                    logger.warning(f"Не удалось удалить временный файл {temp_wav_path}: {e}")
+            try:
+                os.unlink(list_path)
+            except OSError:
+                pass
     
     def get_audio_info(self, file_path: str) -> Dict[str, Any]:
         """
@@ -292,31 +703,267 @@ class AudioMerger:
             file_path: Путь к аудиофайлу
         
         Returns:
-            Словарь с информацией
+            Словарь с информацией (sample_width равен None, если
+            размер сэмпла не определен, например для mp3)
         """
         if not os.path.exists(file_path):
             raise AudioMergerError(f"Аудиофайл не найден: {file_path}")
         
         try:
-            audio = AudioSegment.from_file(file_path)
+            suffix = Path(file_path).suffix.lower()
+            
+            # Параметры читаются из заголовка без декодирования аудио;
+            # декодирование через pydub - последний вариант
+            header_info = None
+            if suffix == '.wav':
+                header_info = _wav_header_info(file_path)
+            if header_info is None:
+                header_info = _soundfile_info(file_path)
+            if header_info is None:
+                header_info = _ffprobe_info(file_path)
+            
+            if header_info is not None:
+                sample_rate, channels, sample_width, duration = header_info
+            else:
+                audio = AudioSegment.from_file(file_path)
+                sample_rate = audio.frame_rate
+                channels = audio.channels
+                sample_width = audio.sample_width
+                duration = len(audio) / 1000.0
+            
             file_size = os.path.getsize(file_path)
             
             return {
                 "file_path": file_path,
-                "duration_seconds": len(audio) / 1000.0,
-                "duration_formatted": format_duration(len(audio) / 1000.0),
-                "sample_rate": audio.frame_rate,
-                "channels": audio.channels,
-                "sample_width": audio.sample_width,
+                "duration_seconds": duration,
+                "duration_formatted": format_duration(duration),
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "sample_width": sample_width,
                 "file_size": file_size,
                 "file_size_formatted": format_file_size(file_size),
-                "format": Path(file_path).suffix.lower()
+                "format": suffix
             }
             
         except Exception as e:
             raise AudioMergerError(f"Ошибка получения информации об аудиофайле: {e}")
 
 
+class StreamingAudioMerger:
+    """
+    Потоковое объединение фрагментов по мере их синтеза
+    
+    Фрагменты принимаются в любом порядке и дописываются в выходной файл
+    в фоновом потоке строго по индексам. WAV пишется модулем wave,
+    остальные форматы кодируются ffmpeg из сырого PCM через stdin.
+    """
+    
+    def __init__(self, output_path: str, target_format: str, ffmpeg_path: Optional[str] = None):
+        """
+        Инициализация потокового объединителя
+        
+        Args:
+            output_path: Путь для сохранения результата
+            target_format: Целевой формат (wav, mp3, ogg)
+            ffmpeg_path: Путь к ffmpeg (обязателен для форматов кроме wav)
+        """
+        self.output_path = output_path
+        self.target_format = target_format
+        self.ffmpeg_path = ffmpeg_path
+        
+        self._queue: "queue.Queue[Optional[Tuple[int, Optional[str]]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="audio-merger", daemon=True)
+        self._error: Optional[Exception] = None
+        
+        self._params: Optional[Any] = None
+        self._writer: Optional[wave.Wave_write] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr = None
+        
+        self.merged_files = 0
+        self.total_frames = 0
+    
+    def start(self) -> "StreamingAudioMerger":
+        """
+        Запуск фонового потока объединения
+        
+        Returns:
+            Текущий экземпляр
+        """
+        output_dir = os.path.dirname(self.output_path)
+        if output_dir:
+            ensure_directory(output_dir)
+        
+        self._thread.start()
+        return self
+    
+    def add(self, index: int, audio_file: Optional[str]) -> None:
+        """
+        Передача готового фрагмента на объединение
+        
+        Args:
+            index: Порядковый индекс фрагмента
+            audio_file: Путь к аудиофайлу или None, если фрагмент не синтезирован
+        """
+        self._queue.put((index, audio_file))
+    
+    def finish(self) -> str:
+        """
+        Завершение объединения после передачи всех фрагментов
+        
+        Returns:
+            Путь к объединенному файлу
+        
+        Raises:
+            AudioMergerError: Если потоковое объединение не удалось
+        """
+        self._queue.put(None)
+        self._thread.join()
+        
+        if self._error is None and self.merged_files == 0:
+            self._error = AudioMergerError("Не получено ни одного аудиофрагмента")
+        
+        if self._error is not None:
+            self._remove_output()
+            raise AudioMergerError(f"Ошибка потокового объединения: {self._error}")
+        
+        logger.info(
+            "Аудиофайлы успешно объединены",
+            output_file=self.output_path,
+            duration=format_duration(self.total_frames / self._params.framerate),
+            file_size=format_file_size(os.stat(self.output_path).st_size),
+            merged_files=self.merged_files
+        )
+        return self.output_path
+    
+    def abort(self) -> None:
+        """Остановка объединения с удалением частичного результата"""
+        if self._error is None:
+            self._error = AudioMergerError("Объединение прервано")
+        self._queue.put(None)
+        self._thread.join()
+        self._remove_output()
+    
+    def _run(self) -> None:
+        """Цикл фонового потока: упорядочивание и запись фрагментов"""
+        pending: Dict[int, Optional[str]] = {}
+        next_index = 0
+        
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            index, audio_file = item
+            pending[index] = audio_file
+            
+            # Пишем все фрагменты, для которых готовы предыдущие
+            while next_index in pending:
+                self._append(pending.pop(next_index))
+                next_index += 1
+        
+        # Фрагменты с пропущенными индексами дописываем по порядку
+        for index in sorted(pending):
+            self._append(pending[index])
+        
+        self._close()
+    
+    def _append(self, audio_file: Optional[str]) -> None:
+        """
+        Запись одного фрагмента в выходной файл
+        
+        Args:
+            audio_file: Путь к WAV фрагменту или None
+        """
+        if audio_file is None or self._error is not None:
+            return
+        
+        try:
+            with wave.open(audio_file, 'rb') as wf:
+                params = wf.getparams()
+                frames = wf.readframes(params.nframes)
+            
+            if self._params is None:
+                self._params = params
+                self._open_output(params)
+            elif (params.nchannels, params.sampwidth, params.framerate, params.comptype) != (
+                    self._params.nchannels, self._params.sampwidth,
+                    self._params.framerate, self._params.comptype):
+                raise AudioMergerError(f"Параметры фрагмента {audio_file} отличаются от первого")
+            
+            if self._writer is not None:
+                self._writer.writeframesraw(frames)
+            else:
+                self._process.stdin.write(frames)
+            
+            self.merged_files += 1
+            self.total_frames += len(frames) // (params.sampwidth * params.nchannels)
+            
+        except Exception as e:
+            self._error = e
+    
+    def _open_output(self, params: Any) -> None:
+        """
+        Открытие выходного файла по параметрам первого фрагмента
+        
+        Args:
+            params: Параметры WAV первого фрагмента
+        """
+        if self.target_format == 'wav':
+            self._writer = wave.open(self.output_path, 'wb')
+            self._writer.setparams(params)
+            return
+        
+        pcm_format = _FFMPEG_PCM_FORMATS.get(params.sampwidth)
+        if self.ffmpeg_path is None or pcm_format is None:
+            raise AudioMergerError(f"Потоковое кодирование в {self.target_format} недоступно")
+        
+        # stderr во временный файл, чтобы ffmpeg не блокировался на заполненном pipe
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            [
+                self.ffmpeg_path, '-y', '-loglevel', 'error',
+                '-f', pcm_format, '-ar', str(params.framerate), '-ac', str(params.nchannels),
+                '-i', 'pipe:0',
+                *_FFMPEG_ENCODE_ARGS[self.target_format],
+                '-f', self.target_format, self.output_path
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._stderr
+        )
+    
+    def _close(self) -> None:
+        """Закрытие выходного файла и завершение ffmpeg"""
+        if self._writer is not None:
+            try:
+                # Закрытие обновляет размеры в заголовке
+                self._writer.close()
+            except Exception as e:
+                self._error = self._error or e
+        
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            
+            if self._process.wait() != 0 and self._error is None:
+                self._stderr.seek(0)
+                message = self._stderr.read().decode(errors='replace').strip()
+                self._error = AudioMergerError(f"ffmpeg завершился с ошибкой: {message}")
+            self._stderr.close()
+    
+    def _remove_output(self) -> None:
+        """Удаление частично записанного результата"""
+        try:
+            os.unlink(self.output_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Не удалось удалить частичный результат {self.output_path}: {e}")
+
+
 # Глобальный экземпляр объединителя
 _audio_merger: Optional[AudioMerger] = None
 
@@ -352,6 +999,21 @@ def merge_audio_files(audio_files: List[str],
     return merger.merge_and_convert(audio_files, output_path, target_format)
 
 
+def start_streaming_merge(output_path: str, target_format: str = 'wav') -> Optional[StreamingAudioMerger]:
+    """
+    Удобная функция для запуска потокового объединения
+    
+    Args:
+        output_path: Путь для сохранения результата
+        target_format: Целевой формат
+    
+    Returns:
+        Запущенный StreamingAudioMerger или None, если потоковое объединение недоступно
+    """
+    merger = get_audio_merger()
+    return merger.start_streaming_merge(output_path, target_format)
+
+
 def convert_audio_format(input_path: str, 
                         output_path: str, 
                         target_format: str) -> str:
@@ -370,6 +1032,20 @@ def convert_audio_format(input_path: str,
     return merger.convert_format(input_path, output_path, target_format)
 
 
+def convert_audio_files(pairs: List[Tuple[str, str, str]]) -> List[str]:
+    """
+    Удобная функция для параллельной конвертации набора аудиофайлов
+    
+    Args:
+        pairs: Список кортежей (исходный файл, выходной файл, целевой формат)
+    
+    Returns:
+        Список путей к сконвертированным файлам
+    """
+    merger = get_audio_merger()
+    return merger.convert_many(pairs)
+
+
 def get_audio_file_info(file_path: str) -> Dict[str, Any]:
     """
     Удобная функция для получения информации об аудиофайле
@@ -384,6 +1060,30 @@ def get_audio_file_info(file_path: str) -> Dict[str, Any]:
     return merger.get_audio_info(file_path)
 
 
+def _is_valid_wav(file_path: str) -> bool:
+    """
+    Проверка WAV файла по заголовку без декодирования
+    
+    Args:
+        file_path: Путь к аудиофайлу
+    
+    Returns:
+        True если файл является корректным WAV
+    """
+    with open(file_path, 'rb') as f:
+        header = f.read(12)
+    
+    if header[0:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return False
+    
+    try:
+        with wave.open(file_path, 'rb') as wf:
+            wf.getparams()
+        return True
+    except (wave.Error, EOFError):
+        return False
+
+
 def validate_audio_files(audio_files: List[str]) -> List[str]:
     """
     Валидация списка аудиофайлов
@@ -400,13 +1100,22 @@ def validate_audio_files(audio_files: List[str]) -> List[str]:
         if not audio_file:
             continue
         
-        if not os.path.exists(audio_file):
+        try:
+            if os.path.getsize(audio_file) == 0:
+                logger.warning(f"Пустой аудиофайл: {audio_file}")
+                continue
+        except OSError:
             logger.warning(f"Аудиофайл не найден: {audio_file}")
             continue
         
         try:
-            # Пробуем загрузить файл для проверки
-            if AudioSegment:
+            if Path(audio_file).suffix.lower() == '.wav':
+                # Для WAV достаточно проверить заголовок
+                if not _is_valid_wav(audio_file):
+                    logger.warning(f"Некорректный WAV файл: {audio_file}")
+                    continue
+            elif AudioSegment:
+                # Пробуем загрузить файл для проверки
                 AudioSegment.from_file(audio_file)
             valid_files.append(audio_file)
             
@@ -416,6 +1125,134 @@ def validate_audio_files(audio_files: List[str]) -> List[str]:
     return valid_files
 
 
+def _wav_header_info(file_path: str) -> Optional[Tuple[int, int, int, float]]:
+    """
+    Чтение параметров из заголовка WAV файла
+    
+    Args:
+        file_path: Путь к аудиофайлу
+    
+    Returns:
+        Кортеж (частота, каналы, размер сэмпла, длительность) или None
+    """
+    try:
+        with wave.open(file_path, 'rb') as wf:
+            sample_rate = wf.getframerate()
+            return sample_rate, wf.getnchannels(), wf.getsampwidth(), wf.getnframes() / sample_rate
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
+
+
+def _soundfile_info(file_path: str) -> Optional[Tuple[int, int, Optional[int], float]]:
+    """
+    Чтение параметров аудиофайла через soundfile
+    
+    Args:
+        file_path: Путь к аудиофайлу
+    
+    Returns:
+        Кортеж (частота, каналы, размер сэмпла, длительность) или None,
+        если soundfile недоступен или не поддерживает формат
+    """
+    if soundfile is None:
+        return None
+    
+    try:
+        info = soundfile.info(file_path)
+    except Exception as e:
+        logger.debug(f"soundfile не смог прочитать {file_path}: {e}")
+        return None
+    
+    return info.samplerate, info.channels, _SOUNDFILE_SAMPLE_WIDTHS.get(info.subtype), info.duration
+
+
+def _ffprobe_info(file_path: str) -> Optional[Tuple[int, int, None, float]]:
+    """
+    Чтение параметров аудиофайла через ffprobe
+    
+    Args:
+        file_path: Путь к аудиофайлу
+    
+    Returns:
+        Кортеж (частота, каналы, None, длительность) или None,
+        если ffprobe недоступен или не смог прочитать файл
+    """
+    ffprobe_path = _find_executable("ffprobe")
+    if not ffprobe_path:
+        return None
+    
+    try:
+        result = subprocess.run(
+            [ffprobe_path, '-v', 'error', '-select_streams', 'a:0',
+             '-show_entries', 'stream=sample_rate,channels:format=duration',
+             '-of', 'default=noprint_wrappers=1', file_path],
+            capture_output=True, text=True, stdin=subprocess.DEVNULL
+        )
+    except OSError as e:
+        logger.debug(f"Ошибка запуска ffprobe: {e}")
+        return None
+    
+    values = dict(
+        line.split('=', 1) for line in result.stdout.splitlines() if '=' in line
+    )
+    
+    try:
+        return int(values['sample_rate']), int(values['channels']), None, float(values['duration'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _probe_duration(file_path: str) -> Optional[float]:
+    """
+    Определение длительности аудиофайла без полного декодирования
+    
+    Для WAV длительность читается из заголовка, для остальных форматов
+    используется ffprobe.
+    
+    Args:
+        file_path: Путь к аудиофайлу
+    
+    Returns:
+        Длительность в секундах или None, если определить не удалось
+    """
+    try:
+        with wave.open(file_path, 'rb') as wf:
+            return wf.getnframes() / wf.getframerate()
+    except (wave.Error, EOFError, ZeroDivisionError):
+        pass
+    
+    ffprobe_path = _find_executable("ffprobe")
+    if not ffprobe_path:
+        return None
+    
+    result = subprocess.run(
+        [ffprobe_path, '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'csv=p=0', file_path],
+        capture_output=True, text=True, stdin=subprocess.DEVNULL
+    )
+    
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _cached_duration(file_path: str, mtime: float, size: int) -> Optional[float]:
+    """
+    Длительность аудиофайла с кэшированием по (путь, mtime, размер)
+    
+    Args:
+        file_path: Путь к аудиофайлу
+        mtime: Время изменения файла
+        size: Размер файла
+    
+    Returns:
+        Длительность в секундах или None
+    """
+    return _probe_duration(file_path)
+
+
 def estimate_merged_duration(audio_files: List[str]) -> float:
     """
     Оценка длительности объединенного аудио
@@ -429,18 +1266,100 @@ def estimate_merged_duration(audio_files: List[str]) -> float:
     total_duration = 0.0
     
     for audio_file in audio_files:
-        if audio_file and os.path.exists(audio_file):
-            try:
-                if AudioSegment:
-                    audio = AudioSegment.from_file(audio_file)
-                    total_duration += len(audio) / 1000.0
-            except Exception:
-                # Если не удалось загрузить файл, пропускаем
+        if not audio_file:
+            continue
+        
+        try:
+            stat = os.stat(audio_file)
+            duration = _cached_duration(audio_file, stat.st_mtime, stat.st_size)
+            if duration is None:
                 continue
+            
+            total_duration += duration
+            
+        except OSError:
+            # Если не удалось прочитать файл, пропускаем
+            continue
     
     return total_duration
 
 
+def _write_wav(output_path: str,
+               frames: Any,
+               nchannels: int,
+               sampwidth: int,
+               framerate: int) -> None:
+    """
+    Запись PCM данных в WAV файл одним проходом
+    
+    Количество фреймов задается заранее, поэтому заголовок сразу
+    записывается с итоговыми размерами и не переписывается при закрытии.
+    
+    Args:
+        output_path: Путь для сохранения
+        frames: PCM данные (bytes, bytearray или memoryview)
+        nchannels: Количество каналов
+        sampwidth: Размер сэмпла в байтах
+        framerate: Частота дискретизации
+    """
+    with wave.open(output_path, 'wb') as out:
+        out.setnchannels(nchannels)
+        out.setsampwidth(sampwidth)
+        out.setframerate(framerate)
+        out.setnframes(len(frames) // (sampwidth * nchannels))
+        out.writeframesraw(frames)
+
+
+def _find_wav_data_chunk(wav_file) -> Tuple[int, int]:
+    """
+    Поиск chunk'а data в RIFF/WAVE файле
+    
+    Args:
+        wav_file: Открытый на чтение в бинарном режиме файл
+    
+    Returns:
+        Кортеж (смещение начала данных, размер данных)
+    """
+    wav_file.seek(12)
+    
+    while True:
+        chunk_header = wav_file.read(8)
+        if len(chunk_header) < 8:
+            raise AudioMergerError("В WAV файле не найден chunk data")
+        
+        chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+        if chunk_id == b'data':
+            return wav_file.tell(), chunk_size
+        
+        # Chunk'и выровнены по границе 2 байт
+        wav_file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def _safe_unlink(audio_file: Optional[str], log_queue: "queue.Queue") -> int:
+    """
+    Удаление одного аудиофайла (выполняется в пуле потоков)
+    
+    Args:
+        audio_file: Путь к аудиофайлу
+        log_queue: Очередь сообщений для логирования в основном потоке
+    
+    Returns:
+        1 если файл удален, иначе 0
+    """
+    if not audio_file:
+        return 0
+    
+    try:
+        os.unlink(audio_file)
+        log_queue.put(("debug", f"Удален аудиофайл: {audio_file}"))
+        return 1
+    except FileNotFoundError:
+        return 0
+    except OSError as e:
+        log_queue.put(("warning", f"Не удалось удалить аудиофайл {audio_file}: {e}"))
+        return 0
+
+
 def cleanup_audio_files(audio_files: List[str]) -> int:
     """
     Очистка списка аудиофайлов
@@ -451,15 +1370,14 @@ def cleanup_audio_files(audio_files: List[str]) -> int:
     Returns:
         Количество удаленных файлов
     """
-    deleted_count = 0
+    log_queue: queue.Queue = queue.Queue()
     
-    for audio_file in audio_files:
-        if audio_file and os.path.exists(audio_file):
-            try:
-                os.unlink(audio_file)
-                deleted_count += 1
-                logger.debug(f"Удален аудиофайл: {audio_file}")
-            except OSError as e:
-                logger.warning(f"Не удалось удалить аудиофайл {audio_file}: {e}")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda f: _safe_unlink(f, log_queue), audio_files))
+    
+    # Логируем из основного потока, чтобы сохранить порядок сообщений
+    while not log_queue.empty():
+        level, message = log_queue.get_nowait()
+        getattr(logger, level)(message)
     
-    return deleted_count
+    return sum(results)
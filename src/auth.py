@@ -3,17 +3,68 @@
 """
 
 import os
+import re
 import json
 import time
-import jwt
+import base64
+import calendar
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 import structlog
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from utils import safe_log
 
 logger = structlog.get_logger(__name__)
 
+# Токен обновляется за 10 минут до истечения
+TOKEN_REFRESH_BUFFER = 600
+
+# Время жизни токена, если IAM API не вернул время истечения (12 часов)
+DEFAULT_TOKEN_TTL = 12 * 3600
+
+# Время истечения токена в ответе IAM API (UTC, дробная часть секунд не нужна)
+_EXPIRES_RE = re.compile(r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)')
+
+# Адрес IAM API, он же audience в JWT
+IAM_TOKEN_URL = 'https://iam.api.cloud.yandex.net/iam/v1/tokens'
+
+# PS256 (RFC 7518): RSASSA-PSS с SHA-256, длина соли равна размеру хэша
+_PS256_PADDING = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=hashes.SHA256.digest_size
+)
+
+
+def _b64url(data: bytes) -> bytes:
+    """
+    Base64url кодирование без выравнивающих символов
+    
+    Args:
+        data: Исходные байты
+    
+    Returns:
+        Закодированные байты
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _b64url_json(obj: Dict[str, Any]) -> bytes:
+    """
+    Компактная JSON сериализация с base64url кодированием
+    
+    Args:
+        obj: Сериализуемый словарь
+    
+    Returns:
+        Закодированные байты
+    """
+    return _b64url(json.dumps(obj, separators=(',', ':')).encode())
+
 
 class YandexAuthError(Exception):
     """Исключение для ошибок аутентификации"""
@@ -28,12 +79,37 @@ class TokenManager:
         Инициализация менеджера токенов
         """
         self.key_data: Optional[Dict[str, Any]] = None
+        self._private_key_obj: Optional[Any] = None
+        self._jwt_header_b64: Optional[bytes] = None
         self.iam_token: Optional[str] = None
         self.token_expires_at: Optional[datetime] = None
+        self._token_expires_monotonic: float = 0.0
+        
+        # Постоянная HTTP сессия для переиспользования соединения с IAM API
+        self._session = self._create_session()
         
         # Загружаем ключ при инициализации
         self._load_key()
     
+    def _create_session(self) -> requests.Session:
+        """
+        Создание HTTP сессии с keep-alive и повторами для IAM API
+        
+        Returns:
+            Настроенная сессия
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(['POST'])
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        return session
+    
     def _load_key(self) -> None:
         """Загрузка авторизованного ключа из переменных окружения"""
         try:
@@ -68,6 +144,19 @@ class TokenManager:
             # Валидация ключа
             self._validate_key()
             
+            # Разбираем PEM один раз, чтобы не делать этого при каждой подписи JWT
+            self._private_key_obj = load_pem_private_key(
+                self.key_data['private_key'].encode(),
+                password=None
+            )
+            
+            # Заголовок JWT не меняется в пределах процесса
+            self._jwt_header_b64 = _b64url_json({
+                'typ': 'JWT',
+                'alg': 'PS256',
+                'kid': self.key_data['id']
+            })
+            
         except json.JSONDecodeError as e:
             raise YandexAuthError(f"Ошибка парсинга JSON ключа: {e}")
         except Exception as e:
@@ -99,29 +188,19 @@ class TokenManager:
         
         now = int(time.time())
         
-        # Заголовок JWT
-        headers = {
-            'typ': 'JWT',
-            'alg': 'PS256',
-            'kid': self.key_data['id']
-        }
-        
         # Полезная нагрузка JWT
         payload = {
             'iss': self.key_data['service_account_id'],
-            'aud': 'https://iam.api.cloud.yandex.net/iam/v1/tokens',
+            'aud': IAM_TOKEN_URL,
             'iat': now,
             'exp': now + 3600  # Токен действует 1 час
         }
         
         try:
-            # Создание JWT токена
-            jwt_token = jwt.encode(
-                payload,
-                self.key_data['private_key'],
-                algorithm='PS256',
-                headers=headers
-            )
+            # Подписываем PS256 напрямую, без универсального JWT кодировщика
+            signing_input = self._jwt_header_b64 + b'.' + _b64url_json(payload)
+            signature = self._private_key_obj.sign(signing_input, _PS256_PADDING, hashes.SHA256())
+            jwt_token = (signing_input + b'.' + _b64url(signature)).decode('ascii')
             
             logger.debug("JWT токен успешно создан")
             return jwt_token
@@ -139,12 +218,12 @@ class TokenManager:
         Returns:
             Ответ с IAM токеном
         """
-        url = 'https://iam.api.cloud.yandex.net/iam/v1/tokens'
+        url = IAM_TOKEN_URL
         headers = {'Content-Type': 'application/json'}
         data = {'jwt': jwt_token}
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 url,
                 headers=headers,
                 json=data,
@@ -168,12 +247,31 @@ class TokenManager:
         Returns:
             True если токен истек или истекает в ближайшие 10 минут
         """
-        if not self.token_expires_at:
-            return True
+        return time.monotonic() >= self._token_expires_monotonic
+    
+    def _parse_token_ttl(self, expires_at_str: Optional[str]) -> float:
+        """
+        Вычисление оставшегося времени жизни токена
+        
+        Args:
+            expires_at_str: Время истечения из ответа IAM API
+        
+        Returns:
+            Время жизни токена в секундах
+        """
+        if not expires_at_str:
+            # Если время не указано, считаем что токен действует 12 часов
+            return DEFAULT_TOKEN_TTL
+        
+        # Формат может быть: 2023-12-31T23:59:59Z или 2023-12-31T23:59:59.123456789Z
+        match = _EXPIRES_RE.match(expires_at_str)
+        if match is None:
+            logger.warning(f"Не удалось распарсить время истечения токена: {expires_at_str}")
+            # Если время некорректно, считаем что токен действует 12 часов
+            return DEFAULT_TOKEN_TTL
         
-        # Обновляем токен за 10 минут до истечения
-        buffer_time = timedelta(minutes=10)
-        return datetime.now() + buffer_time >= self.token_expires_at
+        expires_at = calendar.timegm(tuple(map(int, match.groups())) + (0, 0, 0))
+        return expires_at - time.time()
     
     def get_iam_token(self, force_refresh: bool = False) -> str:
         """
@@ -198,29 +296,10 @@ class TokenManager:
             # Сохраняем токен и время истечения
             self.iam_token = iam_response['iamToken']
             
-            # Парсим время истечения из ответа
-            expires_at_str = iam_response.get('expiresAt')
-            if expires_at_str:
-                try:
-                    # Формат может быть: 2023-12-31T23:59:59Z или 2023-12-31T23:59:59.123456789Z
-                    # Убираем Z и обрабатываем наносекунды
-                    clean_time = expires_at_str.replace('Z', '')
-                    
-                    # Если есть наносекунды, обрезаем до микросекунд (6 знаков)
-                    if '.' in clean_time:
-                        time_part, fraction = clean_time.split('.')
-                        # Обрезаем до 6 знаков (микросекунды)
-                        fraction = fraction[:6].ljust(6, '0')
-                        clean_time = f"{time_part}.{fraction}"
-                    
-                    self.token_expires_at = datetime.fromisoformat(clean_time)
-                except (ValueError, AttributeError) as e:
-                    logger.warning(f"Не удалось распарсить время истечения токена: {e}")
-                    # Если время не указано или некорректно, считаем что токен действует 12 часов
-                    self.token_expires_at = datetime.now() + timedelta(hours=12)
-            else:
-                # Если время не указано, считаем что токен действует 12 часов
-                self.token_expires_at = datetime.now() + timedelta(hours=12)
+            # Вычисляем время жизни токена один раз при обновлении
+            ttl_seconds = self._parse_token_ttl(iam_response.get('expiresAt'))
+            self.token_expires_at = datetime.now() + timedelta(seconds=ttl_seconds)
+            self._token_expires_monotonic = time.monotonic() + ttl_seconds - TOKEN_REFRESH_BUFFER
             
             safe_log(
                 logger, "info", "IAM токен успешно получен",
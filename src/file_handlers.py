@@ -3,17 +3,38 @@
 """
 
 import os
+import io
 import re
+import mmap
+import multiprocessing
+import codecs
+import stat
+import hashlib
+import zipfile
+import tempfile
+import time
+import warnings
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator, AnyStr
 from pathlib import Path
 import structlog
 
 # Импорты для обработки файлов
 try:
     import docx
+    from docx.text.paragraph import Paragraph
 except ImportError:
     docx = None
+    Paragraph = None
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
 
 try:
     import PyPDF2
@@ -25,10 +46,149 @@ try:
 except ImportError:
     pdfplumber = None
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
 from utils import get_file_extension, format_file_size
 
 logger = structlog.get_logger(__name__)
 
+# Результат последнего stat() в потоке, переиспользуется между
+# validate_file и get_file_info для одного и того же файла. Запись
+# используется один раз и не старше _STAT_CACHE_TTL секунд
+_stat_cache = threading.local()
+_STAT_CACHE_TTL = 1.0
+
+# Метки порядка байтов и соответствующие кодировки
+_BOMS = (
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+)
+
+# Объем начала файла для определения кодировки
+_ENCODING_SNIFF_SIZE = 64 * 1024
+
+# Кириллические кодировки, догадке о которых можно доверять и при низкой
+# уверенности; DOS кодировки (cp1125 и т.п.) charset_normalizer нередко
+# выбирает для коротких текстов в cp1251
+_GUESS_ENCODINGS = frozenset({'cp1251', 'koi8-r', 'koi8-u', 'iso8859-5', 'mac-cyrillic'})
+
+# Порог уверенности для прочих кодировок: почти нет "мусорных" символов
+# и распознан язык текста
+_GUESS_MAX_CHAOS = 0.01
+_GUESS_MIN_COHERENCE = 0.5
+
+# Элементы WordprocessingML, нужные для извлечения текста
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P = _W_NS + 'p'
+_W_T = _W_NS + 't'
+_W_TAB = _W_NS + 'tab'
+_W_BR = _W_NS + 'br'
+
+# Надписи (text box) и запасное содержимое mc:AlternateContent: их текст
+# не относится к абзацу-владельцу, а Fallback дублирует Choice
+_W_TXBX = _W_NS + 'txbxContent'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+_DOCX_SKIPPED = (_W_TXBX, _MC_FALLBACK)
+
+# Регулярные выражения для обработки Markdown
+_RE_FENCED = re.compile(r'```[^`]*```', re.DOTALL)
+_RE_BLANK = re.compile(r'\n\s*\n')
+
+# Строчная разметка: ссылки, выделение и инлайн код
+_MD_INLINE = (
+    r'(?P<link>\[(?P<link_text>[^\]]+)\]\([^\)]+\))'
+    r'|(?P<bold>\*\*(?P<bold_text>[^\*]+)\*\*|__(?P<bold_u_text>[^_]+)__)'
+    r'|(?P<ital>\*(?P<ital_text>[^\*]+)\*|_(?P<ital_u_text>[^_]+)_)'
+    r'|(?P<code>`(?P<code_text>[^`]+)`)'
+)
+
+# Вся остальная разметка снимается одним проходом; строчные конструкции
+# (заголовки и маркеры списков) стоят первыми, чтобы "* " в начале строки
+# не принимался за курсив
+_RE_MD = re.compile(
+    r'(?P<head>^#{1,6}\s+)'
+    r'|(?P<bullet>^[ \t]*[-*+]\s+)'
+    r'|(?P<num>^[ \t]*\d+\.\s+)'
+    r'|' + _MD_INLINE,
+    re.MULTILINE
+)
+
+# Повторные проходы для вложенной разметки (**`код`**, [**ссылка**](...))
+_RE_MD_INLINE = re.compile(_MD_INLINE)
+
+# Те же выражения для bytes: ASCII файлы обрабатываются без декодирования
+_RE_FENCED_BYTES, _RE_BLANK_BYTES, _RE_MD_BYTES, _RE_MD_INLINE_BYTES = (
+    re.compile(pattern.pattern.encode('ascii'), pattern.flags & ~re.UNICODE)
+    for pattern in (_RE_FENCED, _RE_BLANK, _RE_MD, _RE_MD_INLINE)
+)
+
+# Группы, содержимое которых остается в тексте
+_MD_TEXT_GROUPS = {
+    'link': ('link_text',),
+    'bold': ('bold_text', 'bold_u_text'),
+    'ital': ('ital_text', 'ital_u_text'),
+    'code': ('code_text',),
+}
+
+
+def _md_repl(match: re.Match) -> AnyStr:
+    """
+    Замена найденной Markdown конструкции
+    
+    Args:
+        match: Совпадение _RE_MD или _RE_MD_BYTES
+    
+    Returns:
+        Текст без разметки (того же типа, что и исходный)
+    """
+    text_groups = _MD_TEXT_GROUPS.get(match.lastgroup)
+    if text_groups is not None:
+        for group in text_groups:
+            text = match.group(group)
+            if text is not None:
+                return text
+    
+    # Заголовки и маркеры списков удаляются целиком; пустая строка нужного типа
+    return match.string[:0]
+
+
+# Количество параллельных процессов для извлечения страниц PDF
+PDF_EXTRACT_THREADS = int(os.getenv('PDF_EXTRACT_THREADS', str(os.cpu_count() or 1)))
+
+# Минимум страниц на процесс: каждый процесс заново разбирает документ,
+# поэтому PDF короче 2 * 25 страниц извлекается последовательно
+_PDF_MIN_PAGES_PER_WORKER = 25
+
+# Дисковый кэш извлеченного текста: предельный размер (0 отключает кэш)
+# и срок хранения записей, к которым давно не обращались
+TEXT_CACHE_MAX_MB = float(os.getenv('TEXT_CACHE_MAX_MB', '64'))
+TEXT_CACHE_MAX_AGE_DAYS = float(os.getenv('TEXT_CACHE_MAX_AGE_DAYS', '7'))
+
+# Версия формата кэша текста; увеличивается при изменении обработчиков
+_TEXT_CACHE_VERSION = 1
+
+# Тексты из файлов больше этого размера не держатся в памяти процесса,
+# повторное чтение для них обслуживает дисковый кэш
+_TEXT_MEMORY_CACHE_MAX_FILE = 4 * 1024 * 1024
+
+# Буфер чтения PDF и предел, до которого файл целиком читается в память
+_PDF_READ_BUFFER = 1 << 20
+_PDF_IN_MEMORY_LIMIT = 50 * 1024 * 1024
+
 
 class FileHandlerError(Exception):
     """Исключение для ошибок обработки файлов"""
@@ -64,10 +224,14 @@ class BaseFileHandler(ABC):
         Returns:
             True если файл валиден
         """
-        if not os.path.exists(file_path):
+        try:
+            file_stat = os.stat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
             return False
         
-        if not os.path.isfile(file_path):
+        _stat_cache.entry = (file_path, file_stat, time.monotonic())
+        
+        if not stat.S_ISREG(file_stat.st_mode):
             return False
         
         extension = get_file_extension(file_path)
@@ -84,14 +248,22 @@ class BaseFileHandler(ABC):
             Словарь с информацией о файле
         """
         path = Path(file_path)
-        stat = path.stat()
+        
+        # Переиспользуем свежий stat() из validate_file для того же файла
+        cached = getattr(_stat_cache, 'entry', None)
+        _stat_cache.entry = None
+        if (cached is not None and cached[0] == file_path
+                and time.monotonic() - cached[2] < _STAT_CACHE_TTL):
+            file_stat = cached[1]
+        else:
+            file_stat = path.stat()
         
         return {
             "name": path.name,
-            "size": stat.st_size,
-            "size_formatted": format_file_size(stat.st_size),
+            "size": file_stat.st_size,
+            "size_formatted": format_file_size(file_stat.st_size),
             "extension": get_file_extension(file_path),
-            "modified": stat.st_mtime
+            "modified": file_stat.st_mtime
         }
 
 
@@ -107,13 +279,43 @@ class TextFileHandler(BaseFileHandler):
         if not self.validate_file(file_path):
             raise FileHandlerError(f"Некорректный .txt файл: {file_path}")
         
-        # Попытка определить кодировку
-        encodings = ['utf-8', 'utf-8-sig', 'cp1251', 'cp866', 'iso-8859-1']
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return ''
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception as e:
+            raise FileHandlerError(f"Ошибка чтения файла {file_path}: {e}")
         
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    text = f.read()
+        try:
+            # Файл читается один раз. Кодировка из BOM используется сразу,
+            # затем строгий utf-8, затем надежная догадка по содержимому,
+            # и только потом типичные кодировки по очереди
+            bom_encoding = self._detect_bom(data)
+            candidates = [bom_encoding] if bom_encoding else []
+            candidates.append('utf-8')
+            if bom_encoding is None:
+                guess = self._guess_encoding(data)
+                if guess:
+                    candidates.append(guess)
+            candidates += ['cp1251', 'cp866', 'iso-8859-1']
+            
+            tried = set()
+            for encoding in candidates:
+                # Нормализуем имя, чтобы не декодировать дважды одной кодировкой
+                try:
+                    encoding = codecs.lookup(encoding).name
+                except LookupError:
+                    continue
+                if encoding in tried:
+                    continue
+                tried.add(encoding)
+                
+                try:
+                    # Декодируем прямо из отображения файла, без копии в bytes
+                    text = str(data, encoding)
+                except UnicodeDecodeError:
+                    continue
                 
                 logger.debug(
                     "Текстовый файл успешно прочитан",
@@ -122,13 +324,58 @@ class TextFileHandler(BaseFileHandler):
                     length=len(text)
                 )
                 return text
-                
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                raise FileHandlerError(f"Ошибка чтения файла {file_path}: {e}")
+        finally:
+            data.close()
         
         raise FileHandlerError(f"Не удалось определить кодировку файла: {file_path}")
+    
+    def _detect_bom(self, data: mmap.mmap) -> Optional[str]:
+        """
+        Определение кодировки по BOM
+        
+        Args:
+            data: Содержимое файла
+        
+        Returns:
+            Название кодировки или None
+        """
+        for bom, encoding in _BOMS:
+            if data[:len(bom)] == bom:
+                return encoding
+        return None
+    
+    def _guess_encoding(self, data: mmap.mmap) -> Optional[str]:
+        """
+        Определение кодировки по началу файла
+        
+        Догадка принимается, только если это кириллическая кодировка
+        или charset_normalizer в ней уверен.
+        
+        Args:
+            data: Содержимое файла
+        
+        Returns:
+            Название кодировки или None
+        """
+        if charset_normalizer is None:
+            return None
+        
+        best = charset_normalizer.from_bytes(data[:_ENCODING_SNIFF_SIZE]).best()
+        if best is None:
+            return None
+        
+        try:
+            encoding = codecs.lookup(best.encoding).name
+        except LookupError:
+            return None
+        
+        if encoding in _GUESS_ENCODINGS or (
+                best.chaos <= _GUESS_MAX_CHAOS and best.coherence >= _GUESS_MIN_COHERENCE):
+            return encoding
+        
+        logger.debug("Кодировка по содержимому отклонена", encoding=encoding,
+                     chaos=best.chaos, coherence=best.coherence)
+        return None
 
 
 class MarkdownFileHandler(BaseFileHandler):
@@ -144,16 +391,22 @@ class MarkdownFileHandler(BaseFileHandler):
             raise FileHandlerError(f"Некорректный .md файл: {file_path}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            raw = Path(file_path).read_bytes()
             
             # Базовая обработка Markdown разметки
-            text = self._process_markdown(content)
+            if raw.isascii():
+                # Для ASCII обрабатываем bytes и декодируем только результат
+                original_length = len(raw)
+                text = self._process_markdown(raw).decode('ascii')
+            else:
+                content = raw.decode('utf-8')
+                original_length = len(content)
+                text = self._process_markdown(content)
             
             logger.debug(
                 "Markdown файл успешно прочитан",
                 file_path=file_path,
-                original_length=len(content),
+                original_length=original_length,
                 processed_length=len(text)
             )
             return text
@@ -161,30 +414,30 @@ class MarkdownFileHandler(BaseFileHandler):
         except Exception as e:
             raise FileHandlerError(f"Ошибка чтения Markdown файла {file_path}: {e}")
     
-    def _process_markdown(self, content: str) -> str:
-        """Базовая обработка Markdown разметки"""
-        # Удаляем заголовки (оставляем только текст)
-        content = re.sub(r'^#{1,6}\s+', '', content, flags=re.MULTILINE)
-        
-        # Удаляем ссылки, оставляем только текст
-        content = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', content)
+    def _process_markdown(self, content: AnyStr) -> AnyStr:
+        """Базовая обработка Markdown разметки (str или ASCII bytes)"""
+        if isinstance(content, bytes):
+            fenced, markup, inline, blank, paragraph_break = (
+                _RE_FENCED_BYTES, _RE_MD_BYTES, _RE_MD_INLINE_BYTES, _RE_BLANK_BYTES, b'\n\n'
+            )
+        else:
+            fenced, markup, inline, blank, paragraph_break = (
+                _RE_FENCED, _RE_MD, _RE_MD_INLINE, _RE_BLANK, '\n\n'
+            )
         
-        # Удаляем жирный и курсивный текст (оставляем содержимое)
-        content = re.sub(r'\*\*([^\*]+)\*\*', r'\1', content)
-        content = re.sub(r'\*([^\*]+)\*', r'\1', content)
-        content = re.sub(r'__([^_]+)__', r'\1', content)
-        content = re.sub(r'_([^_]+)_', r'\1', content)
+        # Удаляем код блоки (отдельный проход: блок занимает несколько строк)
+        content = fenced.sub(paragraph_break[:0], content)
         
-        # Удаляем код блоки
-        content = re.sub(r'```[^`]*```', '', content, flags=re.DOTALL)
-        content = re.sub(r'`([^`]+)`', r'\1', content)
+        # Удаляем заголовки, списки, ссылки, выделение и инлайн код за один проход
+        content, replaced = markup.subn(_md_repl, content)
         
-        # Удаляем списки (оставляем только текст)
-        content = re.sub(r'^\s*[-*+]\s+', '', content, flags=re.MULTILINE)
-        content = re.sub(r'^\s*\d+\.\s+', '', content, flags=re.MULTILINE)
+        # Содержимое замены повторно не сканируется, поэтому вложенная
+        # разметка снимается, пока текст меняется (каждая замена его укорачивает)
+        while replaced:
+            content, replaced = inline.subn(_md_repl, content)
         
         # Очищаем лишние пробелы и переносы
-        content = re.sub(r'\n\s*\n', '\n\n', content)
+        content = blank.sub(paragraph_break, content)
         content = content.strip()
         
         return content
@@ -197,47 +450,259 @@ class DocxFileHandler(BaseFileHandler):
         super().__init__()
         self.supported_extensions = ['.docx']
         
-        if docx is None:
-            logger.warning("python-docx не установлен, .docx файлы не поддерживаются")
+        if docx is None and etree is None:
+            logger.warning("python-docx и lxml не установлены, .docx файлы не поддерживаются")
     
     def extract_text(self, file_path: str) -> str:
         """Извлечение текста из .docx файла"""
-        if docx is None:
-            raise FileHandlerError("python-docx не установлен")
+        if docx is None and etree is None:
+            raise FileHandlerError("python-docx или lxml должны быть установлены")
         
         if not self.validate_file(file_path):
             raise FileHandlerError(f"Некорректный .docx файл: {file_path}")
         
         try:
-            doc = docx.Document(file_path)
+            result = None
             
-            # Извлекаем текст из всех параграфов
-            paragraphs = []
-            for paragraph in doc.paragraphs:
-                text = paragraph.text.strip()
-                if text:
-                    paragraphs.append(text)
+            # Потоковый разбор XML без объектной модели python-docx
+            if etree is not None:
+                result = self._stream_paragraphs(file_path)
             
-            # Извлекаем текст из таблиц
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text = cell.text.strip()
-                        if text:
-                            paragraphs.append(text)
+            if result is None:
+                if docx is None:
+                    raise FileHandlerError("В архиве нет word/document.xml, а python-docx не установлен")
+                result = self._extract_with_python_docx(file_path)
             
-            full_text = '\n\n'.join(paragraphs)
+            full_text, paragraphs_count = result
             
             logger.debug(
                 "DOCX файл успешно прочитан",
                 file_path=file_path,
-                paragraphs_count=len(paragraphs),
+                paragraphs_count=paragraphs_count,
                 length=len(full_text)
             )
             return full_text
             
         except Exception as e:
             raise FileHandlerError(f"Ошибка чтения DOCX файла {file_path}: {e}")
+    
+    def _stream_paragraphs(self, file_path: str) -> Optional[Tuple[str, int]]:
+        """
+        Потоковое извлечение параграфов из word/document.xml
+        
+        Параграфы таблиц идут в порядке документа, а не после основного текста.
+        Текст надписей и блоков mc:Fallback пропускается, как и в python-docx.
+        
+        Args:
+            file_path: Путь к файлу
+        
+        Returns:
+            Кортеж (текст, количество параграфов) или None, если в архиве нет document.xml
+        """
+        buf = io.StringIO()
+        paragraphs_count = 0
+        parts = []
+        # Глубина вложенности в пропускаемые элементы
+        skipped_depth = 0
+        
+        with zipfile.ZipFile(file_path) as archive:
+            try:
+                document = archive.open('word/document.xml')
+            except KeyError:
+                return None
+            
+            with document:
+                for event, element in etree.iterparse(
+                        document, events=('start', 'end'),
+                        tag=(_W_P, _W_T, _W_TAB, _W_BR) + _DOCX_SKIPPED):
+                    tag = element.tag
+                    
+                    if tag in _DOCX_SKIPPED:
+                        skipped_depth += 1 if event == 'start' else -1
+                        continue
+                    
+                    if event == 'start':
+                        continue
+                    
+                    if skipped_depth:
+                        # Параграфы внутри надписи не завершают абзац-владелец
+                        if tag == _W_P:
+                            element.clear()
+                        continue
+                    
+                    if tag == _W_T:
+                        if element.text:
+                            parts.append(element.text)
+                    elif tag == _W_TAB:
+                        parts.append('\t')
+                    elif tag == _W_BR:
+                        parts.append('\n')
+                    else:
+                        text = ''.join(parts)
+                        if text and not text.isspace():
+                            buf.write(text)
+                            buf.write('\n\n')
+                            paragraphs_count += 1
+                        parts.clear()
+                        # Освобождаем разобранный параграф
+                        element.clear()
+        
+        return buf.getvalue().strip(), paragraphs_count
+    
+    def _extract_with_python_docx(self, file_path: str) -> Tuple[str, int]:
+        """
+        Извлечение параграфов через объектную модель python-docx
+        
+        Args:
+            file_path: Путь к файлу
+        
+        Returns:
+            Кортеж (текст, количество параграфов)
+        """
+        doc = docx.Document(file_path)
+        buf = io.StringIO()
+        paragraphs_count = 0
+        
+        # Один обход дерева находит и параграфы таблиц в порядке документа;
+        # параграфы надписей и mc:Fallback пропускаются, как в потоковом разборе
+        for element in doc.element.body.iter(_W_P):
+            if any(ancestor.tag in _DOCX_SKIPPED for ancestor in element.iterancestors()):
+                continue
+            
+            text = Paragraph(element, doc).text
+            if text and not text.isspace():
+                buf.write(text)
+                buf.write('\n\n')
+                paragraphs_count += 1
+        
+        return buf.getvalue().strip(), paragraphs_count
+
+
+def _pdf_mp_context() -> multiprocessing.context.BaseContext:
+    """
+    Контекст запуска процессов для извлечения страниц PDF
+    
+    fork копирует блокировки, захваченные другими потоками (например,
+    фоновой проверкой аутентификации в requests/logging), и воркер может
+    зависнуть. forkserver и spawn запускают воркеры из чистого процесса.
+    
+    Returns:
+        Контекст multiprocessing
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def _split_page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Разбиение страниц документа на непрерывные диапазоны по воркерам
+    
+    Args:
+        page_count: Количество страниц
+        workers: Количество воркеров
+    
+    Returns:
+        Список диапазонов (начало, конец)
+    """
+    workers = max(1, min(workers, page_count))
+    step, extra = divmod(page_count, workers)
+    
+    ranges = []
+    start = 0
+    for i in range(workers):
+        stop = start + step + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _pdfplumber_pages(file_path: str, start: int, stop: int) -> Tuple[str, int]:
+    """
+    Извлечение текста диапазона страниц с помощью pdfplumber
+    
+    Каждый процесс открывает документ сам: объекты страниц
+    pdfplumber не передаются между процессами.
+    
+    Args:
+        file_path: Путь к PDF файлу
+        start: Индекс первой страницы
+        stop: Индекс после последней страницы
+    
+    Returns:
+        Кортеж (текст страниц с разделителями, количество непустых страниц)
+    """
+    buf = io.StringIO()
+    pages_count = 0
+    
+    with pdfplumber.open(file_path) as pdf:
+        for page_num in range(start, stop):
+            try:
+                text = pdf.pages[page_num].extract_text()
+                if text and not text.isspace():
+                    buf.write(text)
+                    buf.write('\n\n')
+                    pages_count += 1
+            except Exception as e:
+                logger.warning(f"Ошибка извлечения текста со страницы {page_num + 1}: {e}")
+    
+    return buf.getvalue(), pages_count
+
+
+@contextmanager
+def _open_pypdf2(file_path: str) -> Iterator["PyPDF2.PdfReader"]:
+    """
+    Открытие PDF для PyPDF2 поверх буферизованного потока
+    
+    PyPDF2 читает часть структур побайтно, поэтому небольшие файлы
+    целиком загружаются в память, а большие читаются с буфером 1 МБ.
+    Предупреждения о восстановимых ошибках структуры подавляются:
+    для извлечения текста они не важны, а их форматирование не бесплатно.
+    
+    Args:
+        file_path: Путь к PDF файлу
+    
+    Returns:
+        Экземпляр PdfReader
+    """
+    with open(file_path, 'rb', buffering=_PDF_READ_BUFFER) as raw:
+        if os.fstat(raw.fileno()).st_size < _PDF_IN_MEMORY_LIMIT:
+            stream = io.BytesIO(raw.read())
+        else:
+            stream = raw
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', PyPDF2.errors.PdfReadWarning)
+            yield PyPDF2.PdfReader(stream, strict=False)
+
+
+def _pypdf2_pages(file_path: str, start: int, stop: int) -> Tuple[str, int]:
+    """
+    Извлечение текста диапазона страниц с помощью PyPDF2
+    
+    Args:
+        file_path: Путь к PDF файлу
+        start: Индекс первой страницы
+        stop: Индекс после последней страницы
+    
+    Returns:
+        Кортеж (текст страниц с разделителями, количество непустых страниц)
+    """
+    buf = io.StringIO()
+    pages_count = 0
+    
+    with _open_pypdf2(file_path) as pdf_reader:
+        for page_num in range(start, stop):
+            try:
+                text = pdf_reader.pages[page_num].extract_text()
+                if text and not text.isspace():
+                    buf.write(text)
+                    buf.write('\n\n')
+                    pages_count += 1
+            except Exception as e:
+                logger.warning(f"Ошибка извлечения текста со страницы {page_num + 1}: {e}")
+    
+    return buf.getvalue(), pages_count
 
 
 class PdfFileHandler(BaseFileHandler):
@@ -247,18 +712,32 @@ class PdfFileHandler(BaseFileHandler):
         super().__init__()
         self.supported_extensions = ['.pdf']
         
-        if PyPDF2 is None and pdfplumber is None:
-            logger.warning("PyPDF2 и pdfplumber не установлены, .pdf файлы не поддерживаются")
+        if not any((fitz, pdfium, pdfplumber, PyPDF2)):
+            logger.warning("PyMuPDF, pypdfium2, pdfplumber и PyPDF2 не установлены, .pdf файлы не поддерживаются")
     
     def extract_text(self, file_path: str) -> str:
         """Извлечение текста из .pdf файла"""
-        if PyPDF2 is None and pdfplumber is None:
-            raise FileHandlerError("PyPDF2 или pdfplumber должны быть установлены")
+        if not any((fitz, pdfium, pdfplumber, PyPDF2)):
+            raise FileHandlerError("PyMuPDF, pypdfium2, pdfplumber или PyPDF2 должны быть установлены")
         
         if not self.validate_file(file_path):
             raise FileHandlerError(f"Некорректный .pdf файл: {file_path}")
         
-        # Пробуем сначала pdfplumber (обычно лучше извлекает текст)
+        # Пробуем сначала PyMuPDF (нативный MuPDF, самый быстрый)
+        if fitz is not None:
+            try:
+                return self._extract_with_pymupdf(file_path)
+            except Exception as e:
+                logger.warning(f"PyMuPDF не смог обработать файл: {e}")
+        
+        # Затем pypdfium2 (PDFium, разрешительная лицензия)
+        if pdfium is not None:
+            try:
+                return self._extract_with_pypdfium2(file_path)
+            except Exception as e:
+                logger.warning(f"pypdfium2 не смог обработать файл: {e}")
+        
+        # Затем pdfplumber (обычно лучше извлекает текст, чем PyPDF2)
         if pdfplumber is not None:
             try:
                 return self._extract_with_pdfplumber(file_path)
@@ -274,50 +753,136 @@ class PdfFileHandler(BaseFileHandler):
         
         raise FileHandlerError(f"Не удалось извлечь текст из PDF файла: {file_path}")
     
-    def _extract_with_pdfplumber(self, file_path: str) -> str:
-        """Извлечение текста с помощью pdfplumber"""
-        pages_text = []
+    def _extract_with_pymupdf(self, file_path: str) -> str:
+        """Извлечение текста с помощью PyMuPDF"""
+        buf = io.StringIO()
+        pages_count = 0
         
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
+        with fitz.open(file_path) as doc:
+            for page_num, page in enumerate(doc, 1):
                 try:
-                    text = page.extract_text()
-                    if text:
-                        pages_text.append(text.strip())
+                    text = page.get_text("text")
+                    if text and not text.isspace():
+                        buf.write(text)
+                        buf.write('\n\n')
+                        pages_count += 1
                 except Exception as e:
                     logger.warning(f"Ошибка извлечения текста со страницы {page_num}: {e}")
         
-        full_text = '\n\n'.join(pages_text)
+        full_text = buf.getvalue().strip()
         
         logger.debug(
-            "PDF файл успешно прочитан (pdfplumber)",
+            "PDF файл успешно прочитан (PyMuPDF)",
             file_path=file_path,
-            pages_count=len(pages_text),
+            pages_count=pages_count,
             length=len(full_text)
         )
         return full_text
     
-    def _extract_with_pypdf2(self, file_path: str) -> str:
-        """Извлечение текста с помощью PyPDF2"""
-        pages_text = []
+    def _extract_with_pypdfium2(self, file_path: str) -> str:
+        """Извлечение текста с помощью pypdfium2"""
+        buf = io.StringIO()
+        pages_count = 0
         
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for page_num, page in enumerate(pdf, 1):
                 try:
-                    text = page.extract_text()
-                    if text:
-                        pages_text.append(text.strip())
+                    textpage = page.get_textpage()
+                    try:
+                        # Текст всей страницы одним вызовом
+                        text = textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                    
+                    if text and not text.isspace():
+                        buf.write(text)
+                        buf.write('\n\n')
+                        pages_count += 1
                 except Exception as e:
                     logger.warning(f"Ошибка извлечения текста со страницы {page_num}: {e}")
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+        
+        full_text = buf.getvalue().strip()
+        
+        logger.debug(
+            "PDF файл успешно прочитан (pypdfium2)",
+            file_path=file_path,
+            pages_count=pages_count,
+            length=len(full_text)
+        )
+        return full_text
+    
+    def _extract_pages(self,
+                       file_path: str,
+                       page_count: int,
+                       extract_range: Callable[[str, int, int], Tuple[str, int]]) -> Tuple[str, int]:
+        """
+        Параллельное извлечение текста страниц с сохранением порядка
+        
+        pdfplumber (pdfminer) и PyPDF2 написаны на чистом Python и не
+        отпускают GIL, поэтому страницы разбираются в отдельных процессах.
+        
+        Args:
+            file_path: Путь к PDF файлу
+            page_count: Количество страниц
+            extract_range: Функция извлечения диапазона страниц
         
-        full_text = '\n\n'.join(pages_text)
+        Returns:
+            Кортеж (текст в порядке документа, количество непустых страниц)
+        """
+        workers = min(PDF_EXTRACT_THREADS, page_count // _PDF_MIN_PAGES_PER_WORKER)
+        ranges = _split_page_ranges(page_count, workers)
+        
+        if len(ranges) <= 1:
+            text, pages_count = extract_range(file_path, 0, page_count)
+            return text.strip(), pages_count
+        
+        buf = io.StringIO()
+        pages_count = 0
+        
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=_pdf_mp_context()) as executor:
+            futures = [
+                executor.submit(extract_range, file_path, start, stop)
+                for start, stop in ranges
+            ]
+            # Результаты собираются в порядке диапазонов
+            for future in futures:
+                text, count = future.result()
+                buf.write(text)
+                pages_count += count
+        
+        return buf.getvalue().strip(), pages_count
+    
+    def _extract_with_pdfplumber(self, file_path: str) -> str:
+        """Извлечение текста с помощью pdfplumber"""
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+        
+        full_text, pages_count = self._extract_pages(file_path, page_count, _pdfplumber_pages)
+        
+        logger.debug(
+            "PDF файл успешно прочитан (pdfplumber)",
+            file_path=file_path,
+            pages_count=pages_count,
+            length=len(full_text)
+        )
+        return full_text
+    
+    def _extract_with_pypdf2(self, file_path: str) -> str:
+        """Извлечение текста с помощью PyPDF2"""
+        with _open_pypdf2(file_path) as pdf_reader:
+            page_count = len(pdf_reader.pages)
+        
+        full_text, pages_count = self._extract_pages(file_path, page_count, _pypdf2_pages)
         
         logger.debug(
             "PDF файл успешно прочитан (PyPDF2)",
             file_path=file_path,
-            pages_count=len(pages_text),
+            pages_count=pages_count,
             length=len(full_text)
         )
         return full_text
@@ -327,13 +892,16 @@ class FileHandlerFactory:
     """Фабрика для создания обработчиков файлов"""
     
     def __init__(self):
-        self.handlers = {
-            '.txt': TextFileHandler(),
-            '.md': MarkdownFileHandler(),
-            '.markdown': MarkdownFileHandler(),
-            '.docx': DocxFileHandler(),
-            '.pdf': PdfFileHandler()
+        # Обработчики создаются при первом обращении к формату,
+        # один экземпляр на класс
+        self._registry = {
+            '.txt': TextFileHandler,
+            '.md': MarkdownFileHandler,
+            '.markdown': MarkdownFileHandler,
+            '.docx': DocxFileHandler,
+            '.pdf': PdfFileHandler
         }
+        self._instances: Dict[type, BaseFileHandler] = {}
     
     def get_handler(self, file_path: str) -> Optional[BaseFileHandler]:
         """
@@ -345,8 +913,14 @@ class FileHandlerFactory:
         Returns:
             Обработчик файла или None
         """
-        extension = get_file_extension(file_path)
-        return self.handlers.get(extension)
+        handler_class = self._registry.get(get_file_extension(file_path))
+        if handler_class is None:
+            return None
+        
+        handler = self._instances.get(handler_class)
+        if handler is None:
+            handler = self._instances.setdefault(handler_class, handler_class())
+        return handler
     
     def is_supported(self, file_path: str) -> bool:
         """
@@ -358,7 +932,31 @@ class FileHandlerFactory:
         Returns:
             True если формат поддерживается
         """
-        return self.get_handler(file_path) is not None
+        return get_file_extension(file_path) in self._registry
+    
+    def validate(self, file_path: str) -> bool:
+        """
+        Валидация файла без создания обработчика
+        
+        Один stat() и одна проверка расширения; результат stat()
+        сохраняется для последующего get_file_info.
+        
+        Args:
+            file_path: Путь к файлу
+        
+        Returns:
+            True если файл существует и его формат поддерживается
+        """
+        if get_file_extension(file_path) not in self._registry:
+            return False
+        
+        try:
+            file_stat = os.stat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return False
+        
+        _stat_cache.entry = (file_path, file_stat, time.monotonic())
+        return stat.S_ISREG(file_stat.st_mode)
     
     def get_supported_extensions(self) -> list:
         """
@@ -367,7 +965,7 @@ class FileHandlerFactory:
         Returns:
             Список расширений
         """
-        return list(self.handlers.keys())
+        return list(self._registry.keys())
 
 
 # Глобальная фабрика обработчиков
@@ -387,12 +985,13 @@ def get_file_factory() -> FileHandlerFactory:
     return _file_factory
 
 
-def extract_text_from_file(file_path: str) -> str:
+def extract_text_from_file(file_path: str, cache_dir: Optional[str] = None) -> str:
     """
     Удобная функция для извлечения текста из файла
     
     Args:
         file_path: Путь к файлу
+        cache_dir: Директория дискового кэша текста (None - без дискового кэша)
     
     Returns:
         Извлеченный текст
@@ -410,7 +1009,133 @@ def extract_text_from_file(file_path: str) -> str:
             f"Поддерживаемые форматы: {', '.join(supported)}"
         )
     
-    return handler.extract_text(file_path)
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        # Ошибку отсутствующего файла сформирует обработчик
+        return handler.extract_text(file_path)
+    
+    if TEXT_CACHE_MAX_MB <= 0:
+        cache_dir = None
+    
+    cache_args = (os.path.abspath(file_path), file_stat.st_mtime_ns, file_stat.st_size, cache_dir)
+    
+    if file_stat.st_size > _TEXT_MEMORY_CACHE_MAX_FILE:
+        return _extract_text_disk_cached(*cache_args)
+    
+    return _extract_text_cached(*cache_args)
+
+
+@lru_cache(maxsize=4)
+def _extract_text_cached(abs_path: str, mtime_ns: int, size: int, cache_dir: Optional[str]) -> str:
+    """
+    Извлечение текста небольших файлов с кэшированием в памяти
+    
+    Args:
+        abs_path: Абсолютный путь к файлу
+        mtime_ns: Время изменения файла в наносекундах
+        size: Размер файла
+        cache_dir: Директория кэша или None
+    
+    Returns:
+        Извлеченный текст
+    """
+    return _extract_text_disk_cached(abs_path, mtime_ns, size, cache_dir)
+
+
+def _extract_text_disk_cached(abs_path: str, mtime_ns: int, size: int, cache_dir: Optional[str]) -> str:
+    """
+    Извлечение текста с кэшированием на диске
+    
+    Ключ включает путь, время изменения и размер файла, обработчик
+    и версию кэша, поэтому устаревшие записи никогда не используются.
+    
+    Args:
+        abs_path: Абсолютный путь к файлу
+        mtime_ns: Время изменения файла в наносекундах
+        size: Размер файла
+        cache_dir: Директория кэша или None
+    
+    Returns:
+        Извлеченный текст
+    """
+    handler = get_file_factory().get_handler(abs_path)
+    
+    if cache_dir is None:
+        return handler.extract_text(abs_path)
+    
+    key = hashlib.blake2b(
+        f"{_TEXT_CACHE_VERSION}:{type(handler).__name__}:{abs_path}:{mtime_ns}:{size}".encode(),
+        digest_size=16
+    ).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{key}.txt")
+    
+    try:
+        with open(cache_path, 'r', encoding='utf-8', errors='surrogatepass') as f:
+            text = f.read()
+        # Отмечаем использование, чтобы запись не удалялась по сроку
+        os.utime(cache_path)
+        logger.debug("Текст взят из кэша", file_path=abs_path, cache_file=cache_path)
+        return text
+    except FileNotFoundError:
+        pass
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"Не удалось прочитать кэш текста {cache_path}: {e}")
+    
+    text = handler.extract_text(abs_path)
+    
+    # Атомарная запись: во временный файл и переименование. Одиночные
+    # суррогаты из PDF сохраняются как есть, чтобы запись не падала
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', errors='surrogatepass') as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        
+        _prune_text_cache(cache_dir)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Не удалось сохранить кэш текста {cache_path}: {e}")
+    
+    return text
+
+
+def _prune_text_cache(cache_dir: str) -> None:
+    """
+    Удаление устаревших записей и вытеснение давно использованных сверх лимита
+    
+    Args:
+        cache_dir: Директория кэша
+    """
+    max_size = int(TEXT_CACHE_MAX_MB * 1024 * 1024)
+    expire_before = time.time() - TEXT_CACHE_MAX_AGE_DAYS * 86400
+    
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.txt') and entry.is_file():
+                file_stat = entry.stat()
+                entries.append((file_stat.st_mtime, file_stat.st_size, entry.path))
+    
+    # Сначала самые старые записи
+    entries.sort()
+    total_size = sum(size for _, size, _ in entries)
+    
+    for mtime, size, path in entries:
+        if mtime >= expire_before and total_size <= max_size:
+            break
+        try:
+            os.unlink(path)
+            total_size -= size
+            logger.debug(f"Удалена запись кэша текста: {path}")
+        except FileNotFoundError:
+            total_size -= size
+        except OSError as e:
+            logger.warning(f"Не удалось удалить запись кэша текста {path}: {e}")
 
 
 def get_file_info(file_path: str) -> Dict[str, Any]:
@@ -429,18 +1154,19 @@ def get_file_info(file_path: str) -> Dict[str, Any]:
     if handler is None:
         # Базовая информация для неподдерживаемых файлов
         path = Path(file_path)
-        if path.exists():
-            stat = path.stat()
-            return {
-                "name": path.name,
-                "size": stat.st_size,
-                "size_formatted": format_file_size(stat.st_size),
-                "extension": get_file_extension(file_path),
-                "modified": stat.st_mtime,
-                "supported": False
-            }
-        else:
+        try:
+            file_stat = path.stat()
+        except FileNotFoundError:
             raise FileHandlerError(f"Файл не найден: {file_path}")
+        
+        return {
+            "name": path.name,
+            "size": file_stat.st_size,
+            "size_formatted": format_file_size(file_stat.st_size),
+            "extension": get_file_extension(file_path),
+            "modified": file_stat.st_mtime,
+            "supported": False
+        }
     
     info = handler.get_file_info(file_path)
     info["supported"] = True
@@ -458,13 +1184,6 @@ def validate_input_file(file_path: str) -> bool:
         True если файл валиден для обработки
     """
     try:
-        factory = get_file_factory()
-        handler = factory.get_handler(file_path)
-        
-        if handler is None:
-            return False
-        
-        return handler.validate_file(file_path)
-        
+        return get_file_factory().validate(file_path)
     except Exception:
         return False
@@ -4,7 +4,10 @@
 
 import os
 import sys
+import contextvars
+import threading
 import click
+from concurrent.futures import Future
 from typing import Optional
 from pathlib import Path
 import structlog
@@ -15,8 +18,8 @@ load_dotenv()
 
 # Импорт модулей приложения
 from utils import (
-    setup_logging, print_colored, format_duration, format_file_size,
-    validate_file_path, get_file_extension, cleanup_temp_files
+    setup_logging, flush_logs, print_colored, format_duration, format_file_size,
+    validate_file_path, get_file_extension, cleanup_temp_files, safe_bind
 )
 from file_handlers import (
     extract_text_from_file, get_file_info, validate_input_file,
@@ -31,7 +34,7 @@ from synthesizer import (
     SynthesizerError
 )
 from audio_merger import (
-    merge_audio_files, get_audio_file_info,
+    merge_audio_files, start_streaming_merge, get_audio_file_info,
     AudioMergerError
 )
 from auth import test_authentication, YandexAuthError
@@ -82,10 +85,14 @@ class TextToAudioApp:
             True если конвертация прошла успешно
         """
         import time
-        self.stats["start_time"] = time.time()
+        self.stats["start_time"] = time.monotonic()
         self.stats["input_file"] = input_file
         self.stats["output_file"] = output_file
         
+        # Поля конвертации попадают во все записи лога до ее окончания
+        structlog.contextvars.clear_contextvars()
+        safe_bind(input_file=input_file, audio_format=audio_format)
+        
         try:
             print_colored("🎤 Text-to-Audio конвертер", "cyan")
             print_colored("=" * 50, "cyan")
@@ -93,22 +100,22 @@ class TextToAudioApp:
             # 1. Валидация входных параметров
             self._validate_inputs(input_file, output_file, audio_format)
             
-            # 2. Тестирование аутентификации
-            self._test_authentication()
-            
-            # 3. Чтение входного файла
+            # 2. Чтение входного файла (нечитаемый файл не требует запроса IAM)
             text = self._read_input_file(input_file)
             self.stats["text_length"] = len(text)
             
+            # 3. Проверка аутентификации в фоне, пока обрабатывается текст
+            auth_future = self._start_auth_check()
+            
             # 4. Обработка текста
             chunks = self._process_text(text)
             self.stats["chunks_count"] = len(chunks)
             
-            # 5. Синтез речи
-            audio_files = self._synthesize_speech(chunks)
+            # Перед синтезом дожидаемся результата аутентификации
+            self._test_authentication(auth_future)
             
-            # 6. Объединение аудио
-            final_audio = self._merge_audio(audio_files, output_file, audio_format)
+            # 5-6. Синтез речи и объединение готовых фрагментов по ходу синтеза
+            audio_files, final_audio = self._synthesize_and_merge(chunks, output_file, audio_format)
             
             # 7. Получение информации о результате
             audio_info = get_audio_file_info(final_audio)
@@ -131,7 +138,9 @@ class TextToAudioApp:
             print_colored(f"❌ Ошибка: {e}", "red")
             return False
         finally:
-            self.stats["end_time"] = time.time()
+            self.stats["end_time"] = time.monotonic()
+            structlog.contextvars.clear_contextvars()
+            flush_logs()
     
     def _validate_inputs(self, input_file: str, output_file: str, audio_format: str) -> None:
         """Валидация входных параметров"""
@@ -155,11 +164,35 @@ class TextToAudioApp:
         
         print_colored("✅ Входные параметры корректны", "green")
     
-    def _test_authentication(self) -> None:
-        """Тестирование аутентификации"""
+    def _start_auth_check(self) -> Future:
+        """
+        Запуск проверки аутентификации в фоновом потоке
+        
+        Поток помечен как daemon: если обработка текста завершилась ошибкой,
+        незавершенный сетевой запрос не задерживает выход из программы.
+        
+        Returns:
+            Future с результатом test_authentication
+        """
+        auth_future: Future = Future()
+        context = contextvars.copy_context()
+        
+        def check() -> None:
+            if not auth_future.set_running_or_notify_cancel():
+                return
+            try:
+                auth_future.set_result(context.run(test_authentication))
+            except BaseException as e:
+                auth_future.set_exception(e)
+        
+        threading.Thread(target=check, name="auth", daemon=True).start()
+        return auth_future
+    
+    def _test_authentication(self, auth_future: Future) -> None:
+        """Ожидание результата фоновой проверки аутентификации"""
         print_colored("🔐 Проверка аутентификации...", "blue")
         
-        if not test_authentication():
+        if not auth_future.result():
             raise YandexAuthError("Ошибка аутентификации с Yandex Cloud")
         
         print_colored("✅ Аутентификация прошла успешно", "green")
@@ -177,7 +210,9 @@ class TextToAudioApp:
             )
             
             # Извлекаем текст
-            text = extract_text_from_file(input_file)
+            text = extract_text_from_file(
+                input_file, cache_dir=os.path.join(self.temp_dir, 'text_cache')
+            )
             
             if not validate_text_for_processing(text):
                 raise ValueError("Файл не содержит достаточно текста для обработки")
@@ -217,7 +252,39 @@ class TextToAudioApp:
         except TextProcessorError as e:
             raise ValueError(f"Ошибка обработки текста: {e}")
     
-    def _synthesize_speech(self, chunks: list) -> list:
+    def _synthesize_and_merge(self, chunks: list, output_file: str, audio_format: str) -> tuple:
+        """Синтез речи с потоковым объединением готовых фрагментов"""
+        try:
+            streaming = start_streaming_merge(output_file, audio_format)
+        except AudioMergerError as e:
+            self.logger.warning("Потоковое объединение недоступно", error=str(e))
+            streaming = None
+        
+        on_chunk_done = None
+        if streaming is not None:
+            def on_chunk_done(chunk) -> None:
+                streaming.add(chunk.index, chunk.audio_file)
+        
+        try:
+            audio_files = self._synthesize_speech(chunks, on_chunk_done)
+        except BaseException:
+            if streaming is not None:
+                streaming.abort()
+            raise
+        
+        if streaming is not None:
+            print_colored("🔗 Объединение аудиофайлов...", "blue")
+            try:
+                final_audio = streaming.finish()
+                print_colored(f"✅ Аудио объединено: {output_file}", "green")
+                return audio_files, final_audio
+            except AudioMergerError as e:
+                # Например, фрагменты с разными параметрами: объединяем обычным способом
+                self.logger.warning("Потоковое объединение не удалось", error=str(e))
+        
+        return audio_files, self._merge_audio(audio_files, output_file, audio_format)
+    
+    def _synthesize_speech(self, chunks: list, on_chunk_done=None) -> list:
         """Синтез речи"""
         print_colored("🎙️  Синтез речи...", "blue")
         
@@ -230,7 +297,7 @@ class TextToAudioApp:
             )
             
             # Синтез
-            audio_files = synthesize_text_chunks(chunks)
+            audio_files = synthesize_text_chunks(chunks, on_chunk_done)
             
             print_colored(
                 f"✅ Синтез завершен: {len(audio_files)} аудиофайлов",
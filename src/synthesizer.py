@@ -3,9 +3,17 @@
 """
 
 import os
+import asyncio
+import contextvars
 import time
+import random
+import shutil
+import hashlib
 import tempfile
-from typing import List, Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from pathlib import Path
 import structlog
 
@@ -17,12 +25,48 @@ except ImportError:
     configure_credentials = None
     creds = None
 
+try:
+    import grpc
+except ImportError:
+    grpc = None
+
 from auth import get_token_manager, YandexAuthError
 from text_processor import TextChunk, clean_text_for_synthesis
 from utils import ProgressTracker, StatisticsCollector, ensure_directory
 
 logger = structlog.get_logger(__name__)
 
+# Адрес API синтеза SpeechKit (тот же, что SDK использует по умолчанию)
+SPEECHKIT_TTS_ENDPOINT = 'tts.api.cloud.yandex.net:443'
+
+# Параметры долгоживущего gRPC канала: keepalive не дает соединению
+# закрыться между запросами, поэтому TLS рукопожатие выполняется один раз
+_GRPC_CHANNEL_OPTIONS = (
+    ('grpc.max_message_length', 128 * 1024 * 1024),
+    ('grpc.max_receive_message_length', 128 * 1024 * 1024),
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+)
+
+# Как часто (в фрагментах) обновлять описание прогресс-бара
+_PROGRESS_DESCRIPTION_STEP = 10
+
+# Временные ошибки, после которых запрос имеет смысл повторить
+_RETRIABLE_HTTP_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+_RETRIABLE_GRPC_CODES = frozenset({
+    'UNAVAILABLE', 'RESOURCE_EXHAUSTED', 'DEADLINE_EXCEEDED', 'ABORTED', 'INTERNAL', 'UNKNOWN'
+})
+
+# Ошибки аутентификации: помогает обновление IAM токена
+_AUTH_HTTP_STATUSES = frozenset({401, 403})
+_AUTH_GRPC_CODES = frozenset({'UNAUTHENTICATED', 'PERMISSION_DENIED'})
+
+# Сколько синтезированных фрагментов может ждать записи на диск
+# сверх числа потоков записи
+_WRITE_QUEUE_SIZE = 4
+
 
 class SynthesizerError(Exception):
     """Исключение для ошибок синтеза речи"""
@@ -30,29 +74,273 @@ class SynthesizerError(Exception):
 
 
 class RateLimiter:
-    """Класс для контроля частоты запросов"""
+    """Класс для контроля частоты запросов (token bucket)"""
     
-    def __init__(self, requests_per_second: float = None):
+    def __init__(self, requests_per_second: float = None, capacity: int = None):
         """
         Инициализация ограничителя частоты
         
         Args:
             requests_per_second: Максимальное количество запросов в секунду
+            capacity: Максимальный размер всплеска запросов (по умолчанию
+                равен количеству запросов в секунду)
         """
         self.requests_per_second = requests_per_second or float(os.getenv('REQUESTS_PER_SECOND', '35'))
-        self.min_interval = 1.0 / self.requests_per_second
-        self.last_request_time = 0.0
+        self.refill_rate = self.requests_per_second
+        self.capacity = capacity or max(1, int(self.requests_per_second))
+        
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self._cond = threading.Condition()
     
     def wait_if_needed(self) -> None:
         """Ожидание если необходимо соблюсти лимит"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        with self._cond:
+            while True:
+                # Пополняем корзину пропорционально прошедшему времени
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                # Ждем появления токена, отпуская блокировку для других потоков
+                self._cond.wait(timeout=(1 - self.tokens) / self.refill_rate)
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """
+    Атомарное размещение копии файла по новому пути
+    
+    Жесткая ссылка не требует повторной записи данных; если она
+    невозможна (другая файловая система), файл копируется.
+    
+    Args:
+        src: Исходный файл
+        dst: Путь назначения (перезаписывается)
+    """
+    tmp_path = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _classify_error(error: Exception) -> str:
+    """
+    Классификация ошибки синтеза для решения о повторной попытке
+    
+    Понимает HTTP статусы (атрибуты status_code/status) и коды gRPC,
+    которые возвращает SpeechKit SDK.
+    
+    Args:
+        error: Исключение запроса синтеза
+    
+    Returns:
+        'retry' для временных ошибок, 'auth' для ошибок аутентификации,
+        'fatal' для ошибок, которые не исправятся повтором
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return 'retry'
+    
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+    if isinstance(status, int):
+        if status in _AUTH_HTTP_STATUSES:
+            return 'auth'
+        if status in _RETRIABLE_HTTP_STATUSES:
+            return 'retry'
+        return 'fatal' if 400 <= status < 500 else 'retry'
+    
+    # grpc.RpcError: code() возвращает StatusCode
+    code_getter = getattr(error, 'code', None)
+    if callable(code_getter):
+        try:
+            code = getattr(code_getter(), 'name', None)
+        except Exception:
+            code = None
+        if code in _AUTH_GRPC_CODES:
+            return 'auth'
+        if code is not None and code not in _RETRIABLE_GRPC_CODES:
+            return 'fatal'
+    
+    # Неизвестные ошибки считаем временными, как и раньше
+    return 'retry'
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """
+    Извлечение рекомендованной сервером задержки из исключения
+    
+    Args:
+        error: Исключение запроса синтеза
+    
+    Returns:
+        Задержка в секундах или None
+    """
+    value = getattr(error, 'retry_after', None)
+    
+    if value is None:
+        # gRPC передает подсказку в trailing metadata
+        metadata_getter = getattr(error, 'trailing_metadata', None)
+        if callable(metadata_getter):
+            try:
+                for key, item in metadata_getter() or ():
+                    if key.lower() == 'retry-after':
+                        value = item
+                        break
+            except Exception:
+                return None
+    
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class SynthesisCache:
+    """Дисковый LRU кэш синтезированных фрагментов"""
+    
+    def __init__(self, cache_dir: str = None, max_size_mb: float = None):
+        """
+        Инициализация кэша
         
-        if time_since_last < self.min_interval:
-            sleep_time = self.min_interval - time_since_last
-            time.sleep(sleep_time)
+        Args:
+            cache_dir: Директория кэша
+            max_size_mb: Максимальный размер кэша в МБ (0 отключает кэш)
+        """
+        self.cache_dir = cache_dir or os.getenv(
+            'TTS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'tts_cache')
+        )
+        if max_size_mb is None:
+            max_size_mb = float(os.getenv('TTS_CACHE_MAX_MB', '1024'))
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.enabled = self.max_size > 0
+        
+        self._lock = threading.Lock()
+        # Ключ -> размер файла, от давно использованных к недавним
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_size = 0
+    
+    @staticmethod
+    def make_key(text: str, voice: str, role: str) -> str:
+        """
+        Вычисление ключа кэша
+        
+        Args:
+            text: Текст для синтеза
+            voice: Голос
+            role: Роль голоса
         
-        self.last_request_time = time.time()
+        Returns:
+            SHA-256 в шестнадцатеричном виде
+        """
+        return hashlib.sha256(f"{voice}|{role}|{text}".encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        """Путь к файлу кэша по ключу"""
+        return os.path.join(self.cache_dir, f"{key}.wav")
+    
+    def _ensure_index(self) -> "OrderedDict[str, int]":
+        """
+        Загрузка индекса кэша по содержимому директории (вызывается под блокировкой)
+        
+        Порядок LRU восстанавливается по времени изменения файлов,
+        которое обновляется при каждом попадании.
+        
+        Returns:
+            Индекс кэша
+        """
+        if self._index is not None:
+            return self._index
+        
+        ensure_directory(self.cache_dir)
+        
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.wav') and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_size = sum(self._index.values())
+        return self._index
+    
+    def get(self, key: str, output_path: str) -> bool:
+        """
+        Размещение закэшированного аудио по пути output_path
+        
+        Args:
+            key: Ключ кэша
+            output_path: Путь для аудиофайла
+        
+        Returns:
+            True при попадании в кэш
+        """
+        cache_path = self._path(key)
+        
+        with self._lock:
+            index = self._ensure_index()
+            if key not in index:
+                return False
+            index.move_to_end(key)
+        
+        try:
+            _link_or_copy(cache_path, output_path)
+            # Отмечаем использование для порядка LRU между запусками
+            os.utime(cache_path)
+            return True
+        except FileNotFoundError:
+            with self._lock:
+                self._total_size -= index.pop(key, 0)
+            return False
+    
+    def put(self, key: str, audio_path: str) -> None:
+        """
+        Сохранение синтезированного аудио в кэш
+        
+        Args:
+            key: Ключ кэша
+            audio_path: Путь к аудиофайлу
+        """
+        try:
+            size = os.path.getsize(audio_path)
+            if size > self.max_size:
+                return
+            
+            with self._lock:
+                index = self._ensure_index()
+            
+            _link_or_copy(audio_path, self._path(key))
+            
+            with self._lock:
+                self._total_size += size - index.pop(key, 0)
+                index[key] = size
+                self._evict()
+                
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить фрагмент в кэш: {e}")
+    
+    def _evict(self) -> None:
+        """Удаление давно использованных записей сверх лимита (под блокировкой)"""
+        while self._total_size > self.max_size and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_size -= size
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
 
 
 class SpeechSynthesizer:
@@ -76,14 +364,31 @@ class SpeechSynthesizer:
         self.voice = voice or os.getenv('DEFAULT_VOICE', 'jane')
         self.role = role or os.getenv('DEFAULT_ROLE', 'good')
         self.temp_dir = temp_dir or os.getenv('TEMP_DIR', tempfile.gettempdir())
+        ensure_directory(self.temp_dir)
+        
+        # Шаблон пути к аудио фрагмента (скобки в пути экранируются для format)
+        self._path_tpl = os.path.join(
+            self.temp_dir.replace('{', '{{').replace('}', '}}'),
+            "chunk_{:04d}.wav"
+        )
         
         # Настройки retry
         self.max_retries = int(os.getenv('MAX_RETRIES', '3'))
         self.retry_delay = float(os.getenv('RETRY_DELAY', '1.0'))
+        self.retry_max_delay = float(os.getenv('RETRY_MAX_DELAY', '30'))
+        
+        # Количество параллельных запросов синтеза
+        self.max_workers = max(1, int(os.getenv('TTS_WORKERS', '8')))
+        
+        # Обновление credentials из нескольких потоков выполняется по одному
+        self._refresh_lock = threading.Lock()
         
         # Ограничитель частоты запросов
         self.rate_limiter = RateLimiter()
         
+        # Кэш уже синтезированных фрагментов
+        self.cache = SynthesisCache()
+        
         # Статистика
         self.stats = StatisticsCollector()
         
@@ -113,6 +418,7 @@ class SpeechSynthesizer:
             
             # Создаем модель синтеза
             self.model = model_repository.synthesis_model()
+            self._configure_channel()
             
             # Настраиваем параметры модели
             self.model.voice = self.voice
@@ -123,6 +429,31 @@ class SpeechSynthesizer:
         except Exception as e:
             raise SynthesizerError(f"Ошибка инициализации SpeechKit SDK: {e}")
     
+    def _configure_channel(self) -> None:
+        """
+        Замена gRPC канала модели на канал с keepalive
+        
+        Модель создается один раз на весь процесс, и все запросы (в том
+        числе из параллельных потоков) мультиплексируются по одному HTTP/2
+        соединению. SDK не позволяет передать опции канала, поэтому канал
+        подменяется после создания модели; без grpc или при другой
+        внутренней структуре SDK остается канал по умолчанию.
+        """
+        old_channel = getattr(self.model, '_channel', None)
+        if grpc is None or old_channel is None:
+            return
+        
+        try:
+            self.model._channel = grpc.secure_channel(
+                SPEECHKIT_TTS_ENDPOINT,
+                grpc.ssl_channel_credentials(),
+                options=list(_GRPC_CHANNEL_OPTIONS)
+            )
+            old_channel.close()
+        except Exception as e:
+            self.model._channel = old_channel
+            logger.warning(f"Не удалось настроить gRPC канал, используется канал SDK: {e}")
+    
     def synthesize_chunk(self, chunk: TextChunk, output_path: str = None) -> str:
         """
         Синтез одного фрагмента текста
@@ -134,9 +465,28 @@ class SpeechSynthesizer:
         Returns:
             Путь к созданному аудиофайлу
         """
+        result, output_path, cache_key = self._request_chunk(chunk, output_path)
+        if result is None:
+            return output_path
+        
+        return self._save_chunk(chunk, result, output_path, cache_key)
+    
+    def _request_chunk(self, chunk: TextChunk, output_path: str = None) -> Tuple[Any, str, Optional[str]]:
+        """
+        Запрос синтеза фрагмента к API (без записи на диск)
+        
+        Args:
+            chunk: Фрагмент текста для синтеза
+            output_path: Путь для сохранения аудио (опционально)
+        
+        Returns:
+            Кортеж (результат синтеза, путь для аудио, ключ кэша); результат
+            равен None, если аудиофайл уже готов (фрагмент обработан ранее
+            или взят из кэша)
+        """
         if chunk.processed:
             logger.debug(f"Фрагмент {chunk.index} уже обработан")
-            return chunk.audio_file
+            return None, chunk.audio_file, None
         
         # Очищаем текст для синтеза
         clean_text = clean_text_for_synthesis(chunk.text)
@@ -146,61 +496,51 @@ class SpeechSynthesizer:
         
         # Генерируем путь для выходного файла
         if output_path is None:
-            ensure_directory(self.temp_dir)
-            output_path = os.path.join(
-                self.temp_dir, 
-                f"chunk_{chunk.index:04d}.wav"
-            )
+            output_path = self._path_tpl.format(chunk.index)
         
-        logger.debug(
-            "Начинаем синтез фрагмента",
-            chunk_index=chunk.index,
-            chunk_length=chunk.length,
-            output_path=output_path
-        )
+        # Тот же текст с тем же голосом берем из кэша без запроса к API
+        cache_key = None
+        if self.cache.enabled:
+            cache_key = self.cache.make_key(clean_text, self.voice, self.role)
+            if self.cache.get(cache_key, output_path):
+                chunk.processed = True
+                chunk.audio_file = output_path
+                self.stats.add_request_stats(True, cached=True)
+                
+                logger.debug(
+                    "Фрагмент взят из кэша",
+                    chunk_index=chunk.index,
+                    output_file=output_path
+                )
+                return None, output_path, None
+        
+        result = self._synthesize_with_retries(chunk, clean_text)
+        return result, output_path, cache_key
+    
+    def _synthesize_with_retries(self, chunk: TextChunk, clean_text: str) -> Any:
+        """
+        Запрос синтеза к API с повторными попытками
+        
+        Args:
+            chunk: Фрагмент текста
+            clean_text: Очищенный текст фрагмента
         
+        Returns:
+            Результат синтеза SDK
+        """
         # Синтез с retry логикой
+        credentials_refreshed = False
         for attempt in range(self.max_retries):
             try:
                 # Соблюдаем лимит частоты запросов
                 self.rate_limiter.wait_if_needed()
                 
                 # Выполняем синтез
-                logger.debug(
-                    "Параметры синтеза",
-                    text_length=len(clean_text),
-                    voice=self.model.voice,
-                    role=self.model.role
-                )
-                
-                result = self.model.synthesize(
+                return self.model.synthesize(
                     clean_text,
                     raw_format=False
                 )
                 
-                # Сохраняем результат
-                result.export(output_path, 'wav')
-                
-                # Проверяем, что файл создан
-                if not os.path.exists(output_path):
-                    raise SynthesizerError("Аудиофайл не был создан")
-                
-                # Обновляем информацию о фрагменте
-                chunk.processed = True
-                chunk.audio_file = output_path
-                
-                # Обновляем статистику
-                self.stats.add_request_stats(True)
-                
-                logger.debug(
-                    "Фрагмент успешно синтезирован",
-                    chunk_index=chunk.index,
-                    output_file=output_path,
-                    attempt=attempt + 1
-                )
-                
-                return output_path
-                
             except Exception as e:
                 error_msg = f"Ошибка синтеза фрагмента {chunk.index}, попытка {attempt + 1}: {e}"
                 logger.warning(error_msg)
@@ -208,22 +548,124 @@ class SpeechSynthesizer:
                 # Обновляем статистику
                 self.stats.add_request_stats(False, str(e))
                 
-                if attempt < self.max_retries - 1:
-                    # Ждем перед повторной попыткой
-                    sleep_time = self.retry_delay * (2 ** attempt)  # Экспоненциальный backoff
-                    time.sleep(sleep_time)
-                    
-                    # Пробуем обновить токен
+                error_kind = _classify_error(e)
+                
+                # Ошибки запроса и повторная ошибка доступа повтором не исправить
+                if error_kind == 'fatal' or (error_kind == 'auth' and credentials_refreshed):
+                    raise SynthesizerError(f"Не удалось синтезировать фрагмент {chunk.index}: {e}")
+                
+                if attempt >= self.max_retries - 1:
+                    # Последняя попытка не удалась
+                    raise SynthesizerError(f"Не удалось синтезировать фрагмент {chunk.index} после {self.max_retries} попыток: {e}")
+                
+                if error_kind == 'auth':
+                    # Обновляем токен один раз и сразу повторяем запрос
+                    credentials_refreshed = True
                     try:
                         self._refresh_credentials()
                     except Exception as refresh_error:
-                        logger.warning(f"Не удалось обновить credentials: {refresh_error}")
-                else:
-                    # Последняя попытка не удалась
-                    raise SynthesizerError(f"Не удалось синтезировать фрагмент {chunk.index} после {self.max_retries} попыток: {e}")
+                        raise SynthesizerError(f"Не удалось обновить credentials: {refresh_error}")
+                    continue
+                
+                # Экспоненциальный backoff с полным jitter, чтобы параллельные
+                # потоки не повторяли запросы одновременно
+                sleep_time = random.uniform(0, min(self.retry_max_delay, self.retry_delay * (2 ** attempt)))
+                
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    sleep_time = max(sleep_time, retry_after)
+                
+                time.sleep(sleep_time)
+    
+    def _save_chunk(self, chunk: TextChunk, result: Any, output_path: str, cache_key: Optional[str]) -> str:
+        """
+        Запись результата синтеза на диск
+        
+        Args:
+            chunk: Синтезированный фрагмент
+            result: Результат синтеза SDK
+            output_path: Путь для аудиофайла
+            cache_key: Ключ кэша (None, если кэш отключен)
+        
+        Returns:
+            Путь к созданному аудиофайлу
+        """
+        # Пишем во временный файл и публикуем атомарно, чтобы прерванная
+        # запись не оставила недописанный WAV под итоговым именем
+        part_path = f"{output_path}.part"
+        try:
+            # export сообщает об ошибке исключением, отдельная проверка файла не нужна
+            result.export(part_path, 'wav')
+            os.replace(part_path, output_path)
+        except Exception as e:
+            try:
+                os.unlink(part_path)
+            except OSError:
+                pass
+            self.stats.add_request_stats(False, str(e))
+            raise SynthesizerError(f"Не удалось сохранить аудио фрагмента {chunk.index}: {e}")
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, output_path)
+        
+        # Обновляем информацию о фрагменте
+        chunk.processed = True
+        chunk.audio_file = output_path
+        
+        # Обновляем статистику
+        self.stats.add_request_stats(True)
+        
+        # Единственная запись на фрагмент в штатном режиме
+        logger.debug(
+            "Фрагмент успешно синтезирован",
+            chunk_index=chunk.index,
+            chunk_length=chunk.length,
+            output_file=output_path
+        )
+        
+        return output_path
+    
+    def _reuse_audio(self, source: TextChunk, chunk: TextChunk) -> Optional[str]:
+        """
+        Использование аудио уже синтезированного фрагмента с тем же текстом
+        
+        Args:
+            source: Синтезированный фрагмент
+            chunk: Фрагмент-повтор
+        
+        Returns:
+            Путь к аудиофайлу фрагмента-повтора или None при ошибке
+        """
+        output_path = self._path_tpl.format(chunk.index)
+        
+        try:
+            _link_or_copy(source.audio_file, output_path)
+        except OSError as e:
+            logger.error(
+                "Не удалось скопировать аудио повторяющегося фрагмента",
+                chunk_index=chunk.index,
+                error=str(e)
+            )
+            return None
+        
+        chunk.processed = True
+        chunk.audio_file = output_path
+        self.stats.add_request_stats(True, deduped=True)
+        
+        logger.debug(
+            "Повторяющийся фрагмент взят из уже синтезированного",
+            chunk_index=chunk.index,
+            source_index=source.index
+        )
+        return output_path
     
     def _refresh_credentials(self) -> None:
         """Обновление credentials для SDK"""
+        with self._refresh_lock:
+            self._do_refresh_credentials()
+    
+    def _do_refresh_credentials(self) -> None:
+        """Обновление credentials для SDK (под блокировкой)"""
         try:
             token_manager = get_token_manager()
             iam_token = token_manager.refresh_token()
@@ -240,12 +682,59 @@ class SpeechSynthesizer:
             logger.error(f"Ошибка обновления credentials: {e}")
             raise
     
-    def synthesize_chunks(self, chunks: List[TextChunk]) -> List[str]:
+    def synthesize_chunks(self, 
+                          chunks: List[TextChunk],
+                          on_chunk_done: Optional[Callable[[TextChunk], None]] = None) -> List[str]:
         """
         Синтез списка фрагментов текста
         
+        Синхронная обертка над synthesize_chunks_async; не вызывается
+        из работающего цикла событий.
+        
+        Args:
+            chunks: Список фрагментов для синтеза
+            on_chunk_done: Вызывается для каждого фрагмента после попытки синтеза,
+                в том числе неудачной (тогда chunk.audio_file равен None)
+        
+        Returns:
+            Список путей к созданным аудиофайлам
+        """
+        try:
+            return asyncio.run(self.synthesize_chunks_async(chunks, on_chunk_done))
+        except KeyboardInterrupt:
+            logger.info("Синтез прерван пользователем")
+            raise
+    
+    async def synthesize_chunk_async(self, chunk: TextChunk, output_path: str = None) -> str:
+        """
+        Асинхронный синтез одного фрагмента текста
+        
+        SDK синхронный, поэтому запрос выполняется в пуле потоков цикла событий.
+        
+        Args:
+            chunk: Фрагмент текста для синтеза
+            output_path: Путь для сохранения аудио (опционально)
+        
+        Returns:
+            Путь к созданному аудиофайлу
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.synthesize_chunk, chunk, output_path)
+    
+    async def synthesize_chunks_async(self,
+                                      chunks: List[TextChunk],
+                                      on_chunk_done: Optional[Callable[[TextChunk], None]] = None) -> List[str]:
+        """
+        Асинхронный синтез списка фрагментов текста
+        
+        Каждая группа одинаковых фрагментов обрабатывается своей корутиной.
+        Блокирующие вызовы SDK и запись на диск выполняются в пулах потоков,
+        а порядок, прогресс и обработчик завершения - в цикле событий.
+        
         Args:
             chunks: Список фрагментов для синтеза
+            on_chunk_done: Вызывается для каждого фрагмента после попытки синтеза,
+                в том числе неудачной (тогда chunk.audio_file равен None)
         
         Returns:
             Список путей к созданным аудиофайлам
@@ -253,55 +742,96 @@ class SpeechSynthesizer:
         if not chunks:
             raise SynthesizerError("Пустой список фрагментов для синтеза")
         
+        total_chars = sum(chunk.length for chunk in chunks)
+        
         logger.info(
             "Начинаем синтез фрагментов",
             total_chunks=len(chunks),
-            total_characters=sum(chunk.length for chunk in chunks)
+            total_characters=total_chars
         )
         
         # Обновляем статистику
-        total_chars = sum(chunk.length for chunk in chunks)
         self.stats.add_text_stats(total_chars, len(chunks))
         
-        # Создаем трекер прогресса
-        progress = ProgressTracker(len(chunks), "Синтез речи")
-        
-        audio_files = []
+        # Результаты раскладываются по позициям, чтобы сохранить порядок
+        audio_files: List[Optional[str]] = [None] * len(chunks)
         successful_chunks = 0
         
-        try:
-            for chunk in chunks:
-                try:
-                    progress.set_description(f"Синтез фрагмента {chunk.index + 1}/{len(chunks)}")
-                    
-                    audio_file = self.synthesize_chunk(chunk)
-                    audio_files.append(audio_file)
-                    successful_chunks += 1
-                    
-                    progress.update(1)
-                    
-                except Exception as e:
-                    logger.error(
-                        "Ошибка синтеза фрагмента",
-                        chunk_index=chunk.index,
-                        error=str(e)
+        # Одинаковые фрагменты (оглавления, заголовки, повторы) синтезируем
+        # один раз: позиция первого фрагмента -> позиции всех его копий
+        duplicates: Dict[int, List[int]] = {}
+        first_by_text: Dict[str, int] = {}
+        for position, chunk in enumerate(chunks):
+            first = first_by_text.setdefault(clean_text_for_synthesis(chunk.text), position)
+            duplicates.setdefault(first, []).append(position)
+        
+        loop = asyncio.get_running_loop()
+        workers = min(self.max_workers, len(duplicates))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        # Запись на диск идет отдельными потоками параллельно запросам к API
+        writer = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-writer")
+        # Ограничивает число фрагментов в работе, а с ним и результаты в памяти
+        in_flight = asyncio.Semaphore(workers + _WRITE_QUEUE_SIZE)
+        
+        async def synthesize_group(first: int) -> Tuple[int, Optional[str]]:
+            chunk = chunks[first]
+            try:
+                async with in_flight:
+                    # Копия контекста переносит в поток поля, привязанные к логам
+                    result, output_path, cache_key = await loop.run_in_executor(
+                        executor, contextvars.copy_context().run, self._request_chunk, chunk
                     )
+                    if result is None:
+                        return first, output_path
                     
-                    # В случае ошибки добавляем None, чтобы сохранить порядок
-                    audio_files.append(None)
+                    # Поток синтеза уже свободен для следующего фрагмента
+                    return first, await loop.run_in_executor(
+                        writer, contextvars.copy_context().run,
+                        self._save_chunk, chunk, result, output_path, cache_key
+                    )
+            except Exception as e:
+                # Можно продолжить с остальными фрагментами
+                logger.error(
+                    "Ошибка синтеза фрагмента",
+                    chunk_index=chunk.index,
+                    error=str(e)
+                )
+                return first, None
+        
+        tasks = [asyncio.create_task(synthesize_group(first)) for first in duplicates]
+        
+        try:
+            # Трекер закрывается при любом выходе из блока
+            with ProgressTracker(len(chunks), "Синтез речи") as progress:
+                done_count = 0
+                for next_done in asyncio.as_completed(tasks):
+                    first, audio_file = await next_done
                     
-                    # Можно продолжить с остальными фрагментами
-                    progress.update(1)
-            
-            # Закрываем прогресс и получаем статистику
-            progress_stats = progress.close()
+                    for position in duplicates[first]:
+                        chunk = chunks[position]
+                        
+                        if position == first:
+                            audio_files[position] = audio_file
+                        elif audio_file is not None:
+                            audio_files[position] = self._reuse_audio(chunks[first], chunk)
+                        
+                        if audio_files[position] is not None:
+                            successful_chunks += 1
+                        
+                        if on_chunk_done is not None:
+                            on_chunk_done(chunk)
+                        
+                        done_count += 1
+                        if done_count % _PROGRESS_DESCRIPTION_STEP == 0 or done_count == len(chunks):
+                            progress.set_description(f"Синтез фрагмента {done_count}/{len(chunks)}")
+                        progress.update(1)
             
             logger.info(
                 "Синтез фрагментов завершен",
                 successful_chunks=successful_chunks,
                 total_chunks=len(chunks),
                 success_rate=successful_chunks / len(chunks),
-                processing_time=progress_stats["elapsed_time"]
+                processing_time=progress.stats.elapsed_time
             )
             
             # Фильтруем None значения
@@ -312,13 +842,14 @@ class SpeechSynthesizer:
             
             return valid_audio_files
             
-        except KeyboardInterrupt:
-            logger.info("Синтез прерван пользователем")
-            progress.close()
-            raise
         except Exception as e:
-            progress.close()
             raise SynthesizerError(f"Критическая ошибка синтеза: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            # При ошибке или прерывании не ждем уже выполняющихся запросов
+            executor.shutdown(wait=False, cancel_futures=True)
+            writer.shutdown(wait=False, cancel_futures=True)
     
     def get_synthesis_stats(self) -> Dict[str, Any]:
         """
@@ -370,18 +901,20 @@ def get_synthesizer() -> SpeechSynthesizer:
     return _synthesizer
 
 
-def synthesize_text_chunks(chunks: List[TextChunk]) -> List[str]:
+def synthesize_text_chunks(chunks: List[TextChunk],
+                           on_chunk_done: Optional[Callable[[TextChunk], None]] = None) -> List[str]:
     """
     Удобная функция для синтеза списка фрагментов
     
     Args:
         chunks: Список фрагментов текста
+        on_chunk_done: Обработчик завершения каждого фрагмента
     
     Returns:
         Список путей к аудиофайлам
     """
     synthesizer = get_synthesizer()
-    return synthesizer.synthesize_chunks(chunks)
+    return synthesizer.synthesize_chunks(chunks, on_chunk_done)
 
 
 def synthesize_single_chunk(chunk: TextChunk, output_path: str = None) -> str:
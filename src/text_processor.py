@@ -4,11 +4,25 @@
 
 import re
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# Паттерны компилируются один раз при импорте модуля
+_RE_CRLF = re.compile(r'\r\n?')
+_RE_SPACES = re.compile(r'[ \t]+')
+_RE_NL3 = re.compile(r'\n{3,}')
+_RE_REPEATED_PUNCT = re.compile(r'([.!?])\1+')
+_RE_STRIP = re.compile(r'[^\w\s.,!?;:()\-—–""«»\']+', re.UNICODE)
+_RE_LETTER = re.compile(r'[а-яёa-z]', re.IGNORECASE)
+
+# Граница куска текста: разрыв абзаца, конец предложения или пробел
+_RE_BOUNDARY = re.compile(r'([.!?]+)?(?:(\s*\n\s*\n\s*)|(\s+))')
+
+# Виды границ в порядке приоритета разреза
+_PARAGRAPH, _SENTENCE, _WORD = 0, 1, 2
+
 
 class TextProcessorError(Exception):
     """Исключение для ошибок обработки текста"""
@@ -18,16 +32,18 @@ class TextProcessorError(Exception):
 class TextChunk:
     """Класс для представления фрагмента текста"""
     
+    __slots__ = ('text', 'index', 'length', 'original_length', 'processed', 'audio_file')
+    
     def __init__(self, text: str, index: int, original_length: int = None):
         """
         Инициализация фрагмента текста
         
         Args:
-            text: Текст фрагмента
+            text: Текст фрагмента (без пробелов по краям)
             index: Индекс фрагмента
             original_length: Длина оригинального текста (для статистики)
         """
-        self.text = text.strip()
+        self.text = text
         self.index = index
         self.length = len(self.text)
         self.original_length = original_length
@@ -52,11 +68,6 @@ class TextSplitter:
             max_chunk_size: Максимальный размер фрагмента в символах
         """
         self.max_chunk_size = max_chunk_size or int(os.getenv('MAX_CHUNK_SIZE', '4500'))
-        
-        # Паттерны для разбивки
-        self.sentence_endings = re.compile(r'[.!?]+\s+')
-        self.paragraph_breaks = re.compile(r'\n\s*\n')
-        self.word_boundaries = re.compile(r'\s+')
     
     def split_text(self, text: str) -> List[TextChunk]:
         """
@@ -88,10 +99,11 @@ class TextSplitter:
         # Разбиваем текст на фрагменты
         chunks = self._split_into_chunks(processed_text)
         
-        # Создаем объекты TextChunk
+        # Создаем объекты TextChunk (фрагменты уже без пробелов по краям,
+        # так как границы разреза не входят во фрагменты)
         text_chunks = []
         for i, chunk_text in enumerate(chunks):
-            if chunk_text.strip():  # Пропускаем пустые фрагменты
+            if chunk_text:  # Пропускаем пустые фрагменты
                 text_chunks.append(TextChunk(chunk_text, i, len(text)))
         
         logger.info(
@@ -112,15 +124,14 @@ class TextSplitter:
         Returns:
             Обработанный текст
         """
-        # Нормализация переносов строк
-        text = re.sub(r'\r\n', '\n', text)
-        text = re.sub(r'\r', '\n', text)
+        # Нормализация переносов строк (\r\n и \r за один проход)
+        text = _RE_CRLF.sub('\n', text)
         
         # Удаление лишних пробелов
-        text = re.sub(r'[ \t]+', ' ', text)
+        text = _RE_SPACES.sub(' ', text)
         
         # Нормализация множественных переносов строк
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _RE_NL3.sub('\n\n', text)
         
         # Удаление пробелов в начале и конце строк
         lines = [line.strip() for line in text.split('\n')]
@@ -138,140 +149,99 @@ class TextSplitter:
         Returns:
             Список фрагментов
         """
-        chunks = []
-        
-        # Сначала пробуем разбить по абзацам
-        paragraphs = self.paragraph_breaks.split(text)
-        
-        current_chunk = ""
-        
-        for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
-                continue
-            
-            # Если абзац помещается в текущий фрагмент
-            potential_chunk = current_chunk + ("\n\n" if current_chunk else "") + paragraph
-            
-            if len(potential_chunk) <= self.max_chunk_size:
-                current_chunk = potential_chunk
-            else:
-                # Сохраняем текущий фрагмент, если он не пустой
-                if current_chunk:
-                    chunks.append(current_chunk)
-                
-                # Если абзац слишком длинный, разбиваем его по предложениям
-                if len(paragraph) > self.max_chunk_size:
-                    sentence_chunks = self._split_by_sentences(paragraph)
-                    chunks.extend(sentence_chunks[:-1])  # Все кроме последнего
-                    current_chunk = sentence_chunks[-1] if sentence_chunks else ""
-                else:
-                    current_chunk = paragraph
-        
-        # Добавляем последний фрагмент
-        if current_chunk:
-            chunks.append(current_chunk)
-        
-        return chunks
+        return [text[start:end] for start, end in self._iter_chunk_spans(text)]
     
-    def _split_by_sentences(self, text: str) -> List[str]:
+    def count_chunks(self, text: str) -> int:
         """
-        Разбивка текста по предложениям
+        Точное количество фрагментов без создания строк
         
         Args:
-            text: Текст для разбивки
+            text: Исходный текст
         
         Returns:
-            Список фрагментов
+            Количество фрагментов, которое вернет split_text
         """
-        chunks = []
+        processed_text = self._preprocess_text(text)
+        if not processed_text:
+            return 0
+        if len(processed_text) <= self.max_chunk_size:
+            return 1
         
-        # Разбиваем по предложениям
-        sentences = self.sentence_endings.split(text)
+        return sum(1 for _ in self._iter_chunk_spans(processed_text))
+    
+    def _iter_chunk_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Поиск границ фрагментов за один проход
         
-        # Восстанавливаем знаки препинания
-        sentence_parts = []
-        endings = self.sentence_endings.findall(text)
+        Для текущего фрагмента запоминаются последние границы абзаца,
+        предложения и слова. При переполнении фрагмент обрезается по самой
+        приоритетной из них, а если границ нет (слово длиннее фрагмента) -
+        принудительно по размеру.
         
-        for i, sentence in enumerate(sentences[:-1]):
-            if sentence.strip():
-                sentence_parts.append(sentence + endings[i].rstrip())
+        Args:
+            text: Предварительно обработанный текст
         
-        # Добавляем последнее предложение
-        if sentences[-1].strip():
-            sentence_parts.append(sentences[-1])
+        Returns:
+            Итератор (начало, конец) фрагментов в тексте
+        """
+        max_size = self.max_chunk_size
+        start = 0
         
-        current_chunk = ""
+        # Последняя граница каждого вида в текущем фрагменте:
+        # (конец куска, начало следующего куска)
+        bounds: List[Optional[Tuple[int, int]]] = [None, None, None]
         
-        for sentence in sentence_parts:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            
-            potential_chunk = current_chunk + (" " if current_chunk else "") + sentence
-            
-            if len(potential_chunk) <= self.max_chunk_size:
-                current_chunk = potential_chunk
-            else:
-                # Сохраняем текущий фрагмент
-                if current_chunk:
-                    chunks.append(current_chunk)
+        for piece_end, next_start, kind in self._iter_boundaries(text):
+            # Пока кусок не помещается, отрезаем фрагменты по лучшей границе
+            while piece_end - start > max_size:
+                bound = bounds[_PARAGRAPH] or bounds[_SENTENCE] or bounds[_WORD]
                 
-                # Если предложение слишком длинное, разбиваем принудительно
-                if len(sentence) > self.max_chunk_size:
-                    word_chunks = self._split_by_words(sentence)
-                    chunks.extend(word_chunks[:-1])
-                    current_chunk = word_chunks[-1] if word_chunks else ""
-                else:
-                    current_chunk = sentence
-        
-        # Добавляем последний фрагмент
-        if current_chunk:
-            chunks.append(current_chunk)
+                if bound is None:
+                    # Даже одно слово слишком длинное, обрезаем его
+                    yield start, start + max_size
+                    start += max_size
+                    continue
+                
+                cut_end, cut_next = bound
+                yield start, cut_end
+                start = cut_next
+                
+                # Границы, оставшиеся до точки разреза, больше не действуют
+                for i, other in enumerate(bounds):
+                    if other is not None and other[0] <= cut_end:
+                        bounds[i] = None
+            
+            if kind is not None:
+                bounds[kind] = (piece_end, next_start)
         
-        return chunks
+        # Последний фрагмент
+        if start < len(text):
+            yield start, len(text)
     
-    def _split_by_words(self, text: str) -> List[str]:
+    @staticmethod
+    def _iter_boundaries(text: str) -> Iterator[Tuple[int, int, Optional[int]]]:
         """
-        Принудительная разбивка по словам (последний резерв)
+        Поиск границ кусков текста за один проход
         
         Args:
             text: Текст для разбивки
         
         Returns:
-            Список фрагментов
+            Итератор (конец куска, начало следующего куска, вид границы);
+            последний кусок заканчивается концом текста без границы
         """
-        chunks = []
-        words = self.word_boundaries.split(text)
-        
-        current_chunk = ""
-        
-        for word in words:
-            if not word.strip():
-                continue
-            
-            potential_chunk = current_chunk + (" " if current_chunk else "") + word
-            
-            if len(potential_chunk) <= self.max_chunk_size:
-                current_chunk = potential_chunk
+        for match in _RE_BOUNDARY.finditer(text):
+            if match.group(2) is not None:
+                kind = _PARAGRAPH
+            elif match.group(1) is not None:
+                kind = _SENTENCE
             else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                
-                # Если даже одно слово слишком длинное, обрезаем его
-                if len(word) > self.max_chunk_size:
-                    # Разбиваем слово на части
-                    for i in range(0, len(word), self.max_chunk_size):
-                        chunk_part = word[i:i + self.max_chunk_size]
-                        chunks.append(chunk_part)
-                    current_chunk = ""
-                else:
-                    current_chunk = word
-        
-        if current_chunk:
-            chunks.append(current_chunk)
-        
-        return chunks
+                kind = _WORD
+            
+            # Знаки конца предложения остаются в куске
+            yield match.end(1) if match.group(1) else match.start(), match.end(), kind
+        
+        yield len(text), len(text), None
 
 
 class TextProcessor:
@@ -316,11 +286,13 @@ class TextProcessor:
             # Валидация фрагментов
             self._validate_chunks(chunks)
             
+            chunk_chars = sum(chunk.length for chunk in chunks)
+            
             logger.info(
                 "Текст успешно обработан",
                 chunks_count=len(chunks),
                 total_characters=len(text),
-                average_chunk_size=sum(chunk.length for chunk in chunks) // len(chunks)
+                average_chunk_size=chunk_chars // len(chunks)
             )
             
             return chunks
@@ -415,25 +387,22 @@ def process_text(text: str) -> List[TextChunk]:
 
 def estimate_chunks_count(text: str, max_chunk_size: int = None) -> int:
     """
-    Оценка количества фрагментов без фактической разбивки
+    Подсчет количества фрагментов без фактической разбивки
+    
+    Выполняет ту же разбивку, что и TextSplitter, но учитывает только
+    границы фрагментов, не создавая строк.
     
     Args:
         text: Исходный текст
         max_chunk_size: Максимальный размер фрагмента
     
     Returns:
-        Примерное количество фрагментов
+        Количество фрагментов
     """
     if not text:
         return 0
     
-    chunk_size = max_chunk_size or int(os.getenv('MAX_CHUNK_SIZE', '4500'))
-    
-    # Простая оценка
-    estimated_count = (len(text) + chunk_size - 1) // chunk_size
-    
-    # Добавляем небольшой запас на разбивку по границам предложений
-    return max(1, int(estimated_count * 1.2))
+    return TextSplitter(max_chunk_size).count_chunks(text)
 
 
 def validate_text_for_processing(text: str) -> bool:
@@ -455,12 +424,18 @@ def validate_text_for_processing(text: str) -> bool:
         return False
     
     # Проверяем, что текст содержит буквы (не только цифры и символы)
-    if not re.search(r'[а-яёa-z]', clean_text, re.IGNORECASE):
+    if not _RE_LETTER.search(clean_text):
         return False
     
     return True
 
 
+def _collapse_punctuation(match: "re.Match[str]") -> str:
+    """Замена повторяющегося знака препинания"""
+    char = match.group(1)
+    return '...' if char == '.' else char
+
+
 def clean_text_for_synthesis(text: str) -> str:
     """
     Очистка текста для синтеза речи
@@ -471,15 +446,16 @@ def clean_text_for_synthesis(text: str) -> str:
     Returns:
         Очищенный текст
     """
-    # Удаляем лишние пробелы
-    text = re.sub(r'\s+', ' ', text)
+    # Удаляем лишние пробелы (split() без аргументов делит по тем же
+    # пробельным символам, что и \s, но работает без движка регулярных выражений)
+    text = ' '.join(text.split())
     
-    # Нормализуем знаки препинания
-    text = re.sub(r'\.{2,}', '...', text)  # Многоточие
-    text = re.sub(r'[!]{2,}', '!', text)   # Множественные восклицательные знаки
-    text = re.sub(r'[?]{2,}', '?', text)   # Множественные вопросительные знаки
+    # Нормализуем знаки препинания за один проход: многоточие,
+    # множественные восклицательные и вопросительные знаки
+    text = _RE_REPEATED_PUNCT.sub(_collapse_punctuation, text)
     
     # Удаляем специальные символы, которые могут мешать синтезу
-    text = re.sub(r'[^\w\s\.,!?;:()\-—–""«»\']+', '', text, flags=re.UNICODE)
+    # (str.translate и модуль regex на этом классе символов не быстрее)
+    text = _RE_STRIP.sub('', text)
     
     return text.strip()
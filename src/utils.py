@@ -3,19 +3,81 @@
 """
 
 import os
+import re
 import sys
+import fnmatch
 import time
 import logging
+import threading
 import structlog
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from collections import deque
+from typing import Optional, Dict, Any, Deque, NamedTuple, BinaryIO
 from pathlib import Path
 from tqdm import tqdm
 from colorama import init, Fore, Style
 
+# Быстрая сериализация JSON логов (опционально)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Инициализация colorama для Windows
 init(autoreset=True)
 
 
+class _StdoutBytesLogger:
+    """
+    Логгер structlog, пишущий байты в буфер stdout без сброса после каждой записи
+    
+    BufferedWriter сам защищает запись блокировкой, поэтому своя не нужна.
+    """
+    
+    def __init__(self, file: BinaryIO):
+        """
+        Инициализация логгера
+        
+        Args:
+            file: Бинарный поток для записи
+        """
+        self.file = file
+    
+    def msg(self, message: bytes) -> None:
+        """Запись одного сообщения"""
+        self.file.write(message + b"\n")
+    
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+def _stdout_bytes_logger(*args: Any) -> _StdoutBytesLogger:
+    """Фабрика логгеров для structlog, пишущих в sys.stdout.buffer"""
+    return _StdoutBytesLogger(sys.stdout.buffer)
+
+
+class _BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler, пишущий байты в буфер stdout без сброса после каждой записи"""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record) + self.terminator
+            self.stream.write(message.encode(sys.stdout.encoding or 'utf-8', 'backslashreplace'))
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def flush_logs() -> None:
+    """Сброс накопленных в буфере stdout логов"""
+    try:
+        sys.stdout.flush()
+    except (OSError, ValueError):
+        # stdout уже закрыт или недоступен
+        pass
+
+
 def setup_logging(log_level: str = "INFO", log_format: str = "json") -> structlog.BoundLogger:
     """
     Настройка системы логирования
@@ -30,14 +92,37 @@ def setup_logging(log_level: str = "INFO", log_format: str = "json") -> structlo
     # Настройка уровня логирования
     level = getattr(logging, log_level.upper(), logging.INFO)
     
-    # Настройка structlog
-    if log_format.lower() == "json":
+    # Вне терминала логи пишутся байтами в буфер stdout и сбрасываются
+    # пачками (и в flush_logs при завершении). Текст print_colored
+    # сбрасывается сразу, поэтому порядок сообщений сохраняется
+    buffered = not sys.stdout.isatty() and getattr(sys.stdout, "buffer", None) is not None
+    
+    # Настройка structlog. Записи пишутся напрямую в stdout, минуя
+    # stdlib logging; уровень фильтрует make_filtering_bound_logger,
+    # поэтому filter_by_level и add_logger_name (имени у логгеров
+    # structlog нет) не используются
+    logger_factory = structlog.PrintLoggerFactory(file=sys.stdout)
+    
+    if log_format.lower() == "json" and orjson is not None:
+        # orjson сразу возвращает UTF-8 байты, которые BytesLogger пишет
+        # в sys.stdout.buffer без декодирования и повторного кодирования.
+        # Цепочка минимальна: приложение не передает позиционные аргументы,
+        # stack_info и bytes, а format_exc_info сохраняет трейсбеки ошибок.
+        # Время пишется числом (UNIX epoch) - в ISO его переводит сборщик логов
         processors = [
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt=None, utc=True, key="ts"),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(serializer=orjson.dumps)
+        ]
+        logger_factory = _stdout_bytes_logger if buffered else structlog.BytesLoggerFactory()
+    elif log_format.lower() == "json":
+        processors = [
+            structlog.contextvars.merge_contextvars,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.TimeStamper(fmt=None, utc=True, key="ts"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
@@ -45,8 +130,7 @@ def setup_logging(log_level: str = "INFO", log_format: str = "json") -> structlo
         ]
     else:
         processors = [
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
+            structlog.contextvars.merge_contextvars,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S"),
@@ -55,21 +139,69 @@ def setup_logging(log_level: str = "INFO", log_format: str = "json") -> structlo
     
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
-        logger_factory=structlog.stdlib.LoggerFactory(),
+        # Вызовы ниже уровня логирования становятся пустыми методами
+        # и не проходят через цепочку процессоров
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
     
-    # Настройка стандартного логгера
+    # Настройка стандартного логгера (для сторонних библиотек)
+    if buffered:
+        handler = _BufferedStreamHandler(sys.stdout.buffer)
+    else:
+        handler = logging.StreamHandler(sys.stdout)
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
+        handlers=[handler],
         level=level,
     )
     
     return structlog.get_logger("text-to-audio")
 
 
+# Имена параметров с секретными данными (private_key покрывается "key")
+_SENSITIVE_RE = re.compile(r'token|password|secret|key', re.IGNORECASE)
+# Частые секретные имена проверяются без регулярного выражения
+_SENSITIVE_EXACT = frozenset({
+    'private_key', 'token', 'password', 'secret', 'key',
+    'api_key', 'access_token', 'refresh_token', 'iam_token'
+})
+
+
+@lru_cache(maxsize=512)
+def _is_sensitive_key(key: str) -> bool:
+    """Проверка имени параметра на секретность (результат кешируется)"""
+    return _SENSITIVE_RE.search(key) is not None
+
+
+def _hide_sensitive(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Замена значений секретных параметров"""
+    return {
+        key: "***HIDDEN***"
+        if key in _SENSITIVE_EXACT or _is_sensitive_key(key) else value
+        for key, value in values.items()
+    }
+
+
+def safe_bind(**kwargs) -> None:
+    """
+    Привязка постоянных полей ко всем записям текущего контекста
+    
+    Секретные поля скрываются один раз при привязке, а не в каждой записи.
+    Поля сбрасываются через structlog.contextvars.clear_contextvars().
+    
+    Args:
+        **kwargs: Поля для привязки
+    """
+    structlog.contextvars.bind_contextvars(**_hide_sensitive(kwargs))
+
+
+_LEVEL_METHODS = ('debug', 'info', 'warning', 'error', 'critical')
+# Уровень -> имя метода логгера, чтобы не вызывать lower() на каждую запись
+_LEVEL_TABLE = {level: level for level in _LEVEL_METHODS}
+
+
 def safe_log(logger: structlog.BoundLogger, level: str, message: str, **kwargs) -> None:
     """
     Безопасное логирование без секретных данных
@@ -81,18 +213,24 @@ def safe_log(logger: structlog.BoundLogger, level: str, message: str, **kwargs)
         **kwargs: Дополнительные параметры
     """
     # Удаляем потенциально секретные данные
-    safe_kwargs = {}
-    sensitive_keys = ['private_key', 'token', 'password', 'secret', 'key']
-    
-    for key, value in kwargs.items():
-        if any(sensitive in key.lower() for sensitive in sensitive_keys):
-            safe_kwargs[key] = "***HIDDEN***"
-        else:
-            safe_kwargs[key] = value
+    safe_kwargs = _hide_sensitive(kwargs)
     
     # Логируем
-    log_method = getattr(logger, level.lower(), logger.info)
-    log_method(message, **safe_kwargs)
+    method_name = _LEVEL_TABLE.get(level) or _LEVEL_TABLE.get(level.lower(), 'info')
+    getattr(logger, method_name)(message, **safe_kwargs)
+
+
+# Прогресс-бар обновляется не чаще раза в полсекунды или 1/200 общего объема
+_PROGRESS_FLUSH_INTERVAL = 0.5
+_PROGRESS_FLUSH_STEPS = 200
+
+
+class TrackerStats(NamedTuple):
+    """Статистика закрытого ProgressTracker"""
+    total_items: int
+    processed_items: int
+    elapsed_time: float
+    items_per_second: float
 
 
 class ProgressTracker:
@@ -109,92 +247,210 @@ class ProgressTracker:
         self.total = total
         self.description = description
         self.current = 0
-        self.start_time = time.time()
-        self.pbar = tqdm(
-            total=total,
-            desc=description,
-            unit="items",
-            bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
+        # Монотонные часы не зависят от перевода системного времени
+        self.start_time = time.monotonic()
+        # Заполняется при закрытии трекера
+        self.stats: Optional[TrackerStats] = None
+        
+        # Прогресс-бар нужен только в интерактивном терминале
+        self._active = (
+            total > 1
+            and sys.stderr.isatty()
+            and os.getenv('TQDM_DISABLE', '') in ('', '0')
         )
+        self.pbar: Optional[tqdm] = None
+        if self._active:
+            self.pbar = tqdm(
+                total=total,
+                desc=description,
+                unit="items",
+                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]",
+                mininterval=_PROGRESS_FLUSH_INTERVAL,
+                miniters=max(1, total // _PROGRESS_FLUSH_STEPS),
+                smoothing=0.1
+            )
+        
+        # Обновления копятся и передаются в tqdm пачками
+        self._pending = 0
+        self._flush_every = max(1, total // _PROGRESS_FLUSH_STEPS)
+        self._last_flush = time.monotonic()
     
     def update(self, count: int = 1) -> None:
         """Обновление прогресса"""
         self.current += count
-        self.pbar.update(count)
+        if not self._active:
+            return
+        
+        self._pending += count
+        
+        if (self._pending >= self._flush_every
+                or time.monotonic() - self._last_flush > _PROGRESS_FLUSH_INTERVAL):
+            self._flush()
+    
+    def _flush(self) -> None:
+        """Передача накопленных обновлений в tqdm"""
+        if self._pending:
+            self.pbar.update(self._pending)
+            self._pending = 0
+        self._last_flush = time.monotonic()
     
     def set_description(self, description: str) -> None:
         """Изменение описания"""
-        self.pbar.set_description(description)
+        if self.pbar is not None:
+            self.pbar.set_description(description)
     
-    def close(self) -> Dict[str, Any]:
+    def close(self) -> TrackerStats:
         """
         Закрытие трекера и возврат статистики
         
+        Повторный вызов возвращает статистику первого закрытия.
+        Для сериализации в словарь используйте TrackerStats._asdict().
+        
         Returns:
-            Словарь со статистикой
+            Статистика трекера
         """
-        elapsed_time = time.time() - self.start_time
-        self.pbar.close()
+        if self.stats is None:
+            elapsed_time = time.monotonic() - self.start_time
+            if self.pbar is not None:
+                self._flush()
+                self.pbar.close()
+            
+            self.stats = TrackerStats(
+                self.total,
+                self.current,
+                elapsed_time,
+                self.current / elapsed_time if elapsed_time > 0 else 0.0
+            )
         
-        return {
-            "total_items": self.total,
-            "processed_items": self.current,
-            "elapsed_time": elapsed_time,
-            "items_per_second": self.current / elapsed_time if elapsed_time > 0 else 0
-        }
+        return self.stats
+    
+    def __enter__(self) -> "ProgressTracker":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+# Сколько последних ошибок хранит StatisticsCollector
+_MAX_STORED_ERRORS = 1000
 
 
 class StatisticsCollector:
     """Класс для сбора статистики обработки"""
     
+    __slots__ = (
+        'start_time', 'end_time', 'total_characters', 'total_chunks',
+        'total_requests', 'successful_requests', 'failed_requests',
+        'cached_requests', 'deduped_requests', 'total_audio_duration',
+        'errors', '_start_monotonic', '_lock', '_dirty', '_cached'
+    )
+    
     def __init__(self):
         """Инициализация коллектора статистики"""
-        self.stats = {
-            "start_time": time.time(),
-            "end_time": None,
-            "total_characters": 0,
-            "total_chunks": 0,
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "total_audio_duration": 0.0,
-            "errors": []
-        }
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.total_characters = 0
+        self.total_chunks = 0
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.failed_requests = 0
+        self.cached_requests = 0
+        self.deduped_requests = 0
+        self.total_audio_duration = 0.0
+        # Хранятся только последние ошибки, чтобы долгие задачи не копили память
+        self.errors: Deque[str] = deque(maxlen=_MAX_STORED_ERRORS)
+        # Длительность считается по монотонным часам, в start_time/end_time
+        # остается время по часам системы
+        self._start_monotonic = time.monotonic()
+        # Статистику обновляют параллельные потоки синтеза
+        self._lock = threading.Lock()
+        # Результат finalize пересчитывается только после изменения счетчиков
+        self._dirty = True
+        self._cached: Optional[Dict[str, Any]] = None
     
     def add_text_stats(self, characters: int, chunks: int) -> None:
         """Добавление статистики по тексту"""
-        self.stats["total_characters"] += characters
-        self.stats["total_chunks"] += chunks
-    
-    def add_request_stats(self, success: bool, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._dirty = True
+            self.total_characters += characters
+            self.total_chunks += chunks
+    
+    def add_request_stats(self,
+                          success: bool,
+                          error: Optional[str] = None,
+                          cached: bool = False,
+                          deduped: bool = False) -> None:
         """Добавление статистики по запросам"""
-        self.stats["total_requests"] += 1
-        if success:
-            self.stats["successful_requests"] += 1
-        else:
-            self.stats["failed_requests"] += 1
-            if error:
-                self.stats["errors"].append(error)
+        with self._lock:
+            self._dirty = True
+            if cached:
+                # Фрагмент взят из кэша, запрос к API не выполнялся
+                self.cached_requests += 1
+                return
+            
+            if deduped:
+                # Фрагмент повторяет уже синтезированный в этом документе
+                self.deduped_requests += 1
+                return
+            
+            self.total_requests += 1
+            if success:
+                self.successful_requests += 1
+            else:
+                self.failed_requests += 1
+                if error:
+                    self.errors.append(error)
     
     def add_audio_duration(self, duration: float) -> None:
         """Добавление длительности аудио"""
-        self.stats["total_audio_duration"] += duration
+        with self._lock:
+            self._dirty = True
+            self.total_audio_duration += duration
     
-    def finalize(self) -> Dict[str, Any]:
+    def finalize(self, deep: bool = False) -> Dict[str, Any]:
         """
         Финализация статистики
         
+        Пока счетчики не менялись, повторные вызовы возвращают тот же
+        словарь (с временем первого из них); изменять его нельзя.
+        
+        Args:
+            deep: Вернуть независимую копию, которую можно изменять
+        
         Returns:
             Полная статистика обработки
         """
-        self.stats["end_time"] = time.time()
-        self.stats["total_time"] = self.stats["end_time"] - self.stats["start_time"]
-        self.stats["success_rate"] = (
-            self.stats["successful_requests"] / self.stats["total_requests"] 
-            if self.stats["total_requests"] > 0 else 0
-        )
-        
-        return self.stats.copy()
+        with self._lock:
+            if not self._dirty and self._cached is not None:
+                if deep:
+                    return {**self._cached, "errors": list(self._cached["errors"])}
+                return self._cached
+            
+            self.end_time = time.time()
+            
+            self._cached = {
+                "start_time": self.start_time,
+                "end_time": self.end_time,
+                "total_characters": self.total_characters,
+                "total_chunks": self.total_chunks,
+                "total_requests": self.total_requests,
+                "successful_requests": self.successful_requests,
+                "failed_requests": self.failed_requests,
+                "cached_requests": self.cached_requests,
+                "deduped_requests": self.deduped_requests,
+                "total_audio_duration": self.total_audio_duration,
+                "errors": list(self.errors),
+                "total_time": time.monotonic() - self._start_monotonic,
+                "success_rate": (
+                    self.successful_requests / self.total_requests
+                    if self.total_requests > 0 else 0
+                ),
+            }
+            self._dirty = False
+            
+            if deep:
+                return {**self._cached, "errors": list(self._cached["errors"])}
+            return self._cached
 
 
 def ensure_directory(path: str) -> Path:
@@ -208,10 +464,25 @@ def ensure_directory(path: str) -> Path:
         Path объект
     """
     dir_path = Path(path)
-    dir_path.mkdir(parents=True, exist_ok=True)
+    # abspath не обращается к файловой системе, в отличие от resolve()
+    _make_directory(os.path.abspath(dir_path))
     return dir_path
 
 
+@lru_cache(maxsize=256)
+def _make_directory(abs_path: str) -> None:
+    """
+    Создание директории один раз за процесс для каждого пути
+    
+    Приложение не удаляет созданные директории, поэтому повторный
+    mkdir для уже созданного пути не нужен.
+    
+    Args:
+        abs_path: Абсолютный путь к директории
+    """
+    Path(abs_path).mkdir(parents=True, exist_ok=True)
+
+
 def format_duration(seconds: float) -> str:
     """
     Форматирование длительности в читаемый вид
@@ -224,15 +495,14 @@ def format_duration(seconds: float) -> str:
     """
     if seconds < 60:
         return f"{seconds:.1f}с"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        secs = seconds % 60
+    minutes, secs = divmod(seconds, 60)
+    if seconds < 3600:
         return f"{int(minutes)}м {secs:.1f}с"
-    else:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        return f"{int(hours)}ч {int(minutes)}м {secs:.1f}с"
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}ч {minutes}м {secs:.1f}с"
+
+
+_SIZE_UNITS = ('Б', 'КБ', 'МБ', 'ГБ', 'ТБ')
 
 
 def format_file_size(bytes_size: int) -> str:
@@ -245,11 +515,27 @@ def format_file_size(bytes_size: int) -> str:
     Returns:
         Отформатированная строка
     """
-    for unit in ['Б', 'КБ', 'МБ', 'ГБ']:
-        if bytes_size < 1024.0:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024.0
-    return f"{bytes_size:.1f} ТБ"
+    if bytes_size < 1024:
+        return f"{bytes_size:.1f} Б"
+    
+    # Каждая следующая единица в 2^10 раз больше, поэтому номер единицы
+    # определяется числом битов размера
+    unit_index = min((int(bytes_size).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{bytes_size / (1 << (unit_index * 10)):.1f} {_SIZE_UNITS[unit_index]}"
+
+
+_COLOR_MAP = {
+    "red": Fore.RED,
+    "green": Fore.GREEN,
+    "yellow": Fore.YELLOW,
+    "blue": Fore.BLUE,
+    "magenta": Fore.MAGENTA,
+    "cyan": Fore.CYAN,
+    "white": Fore.WHITE
+}
+
+# Цветной вывод только в терминал
+_IS_TTY = sys.stdout.isatty()
 
 
 def print_colored(message: str, color: str = "white") -> None:
@@ -260,17 +546,14 @@ def print_colored(message: str, color: str = "white") -> None:
         message: Сообщение
         color: Цвет (red, green, yellow, blue, magenta, cyan, white)
     """
-    color_map = {
-        "red": Fore.RED,
-        "green": Fore.GREEN,
-        "yellow": Fore.YELLOW,
-        "blue": Fore.BLUE,
-        "magenta": Fore.MAGENTA,
-        "cyan": Fore.CYAN,
-        "white": Fore.WHITE
-    }
-    
-    color_code = color_map.get(color.lower(), Fore.WHITE)
+    # При выводе в файл или pipe escape-последовательности не нужны
+    # Сброс сразу: логи вне терминала пишутся в буфер stdout байтами
+    # и не должны обгонять текст, ожидающий в текстовом слое
+    if not _IS_TTY:
+        print(message, flush=True)
+        return
+    
+    color_code = _COLOR_MAP.get(color.lower(), Fore.WHITE)
     print(f"{color_code}{message}{Style.RESET_ALL}")
 
 
@@ -298,6 +581,7 @@ def validate_file_path(file_path: str, must_exist: bool = True) -> bool:
             return False
 
 
+@lru_cache(maxsize=4096)
 def get_file_extension(file_path: str) -> str:
     """
     Получение расширения файла
@@ -308,7 +592,7 @@ def get_file_extension(file_path: str) -> str:
     Returns:
         Расширение файла в нижнем регистре
     """
-    return Path(file_path).suffix.lower()
+    return os.path.splitext(file_path)[1].lower()
 
 
 def cleanup_temp_files(temp_dir: str, pattern: str = "*") -> int:
@@ -328,10 +612,19 @@ def cleanup_temp_files(temp_dir: str, pattern: str = "*") -> int:
     
     deleted_count = 0
     try:
-        for file_path in temp_path.glob(pattern):
-            if file_path.is_file():
-                file_path.unlink()
-                deleted_count += 1
+        if '/' in pattern or os.sep in pattern or '**' in pattern:
+            # Паттерн с поддиректориями обрабатывает glob
+            for file_path in temp_path.glob(pattern):
+                if file_path.is_file():
+                    file_path.unlink()
+                    deleted_count += 1
+        else:
+            # scandir отдает тип файла из записи директории без отдельного stat
+            with os.scandir(temp_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and fnmatch.fnmatch(entry.name, pattern):
+                        os.unlink(entry.path)
+                        deleted_count += 1
     except (OSError, PermissionError) as e:
         print_colored(f"Ошибка при очистке временных файлов: {e}", "yellow")
     